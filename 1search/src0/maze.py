@@ -79,6 +79,7 @@ class Maze():
             self.walls.append(row)
 
         self.solution = None
+        self.base = None
 
 
     def print(self):
@@ -127,8 +128,9 @@ class Maze():
         frontier = QueueFrontier()
         frontier.add(start)
 
-        # Initialize an empty explored set
+        # Initialize an empty explored set, remembering the order for animations
         self.explored = set()
+        self.explored_order = []
 
         # Keep looping until solution found
         while True:
@@ -156,6 +158,7 @@ class Maze():
 
             # Mark node as explored
             self.explored.add(node.state)
+            self.explored_order.append(node.state)
 
             # Add neighbors to frontier
             for action, state in self.neighbors(node.state):
@@ -164,10 +167,27 @@ class Maze():
                     frontier.add(child)
 
 
-    def output_image(self, filename, show_solution=True, show_explored=False):
-        from PIL import Image, ImageDraw
+    def draw_cell(self, draw, cell, fill):
+        """Draws a single cell onto an image."""
+        i, j = cell
         cell_size = 50
         cell_border = 2
+        draw.rectangle(
+            ([(j * cell_size + cell_border, i * cell_size + cell_border),
+              ((j + 1) * cell_size - cell_border, (i + 1) * cell_size - cell_border)]),
+            fill=fill
+        )
+
+
+    def base_image(self):
+        """
+        Returns an image of the walls, start and goal.
+        It is drawn once and reused by every later image.
+        """
+        if self.base is not None:
+            return self.base
+        from PIL import Image, ImageDraw
+        cell_size = 50
 
         # Create a blank canvas
         img = Image.new(
@@ -177,7 +197,6 @@ class Maze():
         )
         draw = ImageDraw.Draw(img)
 
-        solution = self.solution[1] if self.solution is not None else None
         for i, row in enumerate(self.walls):
             for j, col in enumerate(row):
 
@@ -193,28 +212,100 @@ class Maze():
                 elif (i, j) == self.goal:
                     fill = (0, 171, 28)
 
-                # Solution
-                elif solution is not None and show_solution and (i, j) in solution:
-                    fill = (220, 235, 113)
-
-                # Explored
-                elif solution is not None and show_explored and (i, j) in self.explored:
-                    fill = (212, 97, 85)
-
                 # Empty cell
                 else:
                     fill = (237, 240, 252)
 
-                # Draw cell
-                draw.rectangle(
-                    ([(j * cell_size + cell_border, i * cell_size + cell_border),
-                      ((j + 1) * cell_size - cell_border, (i + 1) * cell_size - cell_border)]),
-                    fill=fill
-                )
+                self.draw_cell(draw, (i, j), fill)
+
+        self.base = img
+        return img
+
+
+    def output_image(self, filename, show_solution=True, show_explored=False):
+        from PIL import ImageDraw
+
+        # Only the explored and solution cells are drawn over the base layer
+        img = self.base_image().copy()
+        draw = ImageDraw.Draw(img)
+
+        solution = self.solution[1] if self.solution is not None else None
+        if solution is not None and show_explored:
+            for cell in self.explored:
+                if cell not in (self.start, self.goal):
+                    self.draw_cell(draw, cell, (212, 97, 85))
+        if solution is not None and show_solution:
+            for cell in solution:
+                if cell != self.goal:
+                    self.draw_cell(draw, cell, (220, 235, 113))
 
         img.save(filename)
 
 
+    def output_animation(self, filename, step=1, duration=50):
+        """
+        Saves an animated GIF of the search, revealing `step` explored
+        cells per frame and finishing with the solution.
+        Frames are written as they are drawn, and each one only holds
+        the region around the cells that changed since the last one.
+        """
+        from PIL import GifImagePlugin, Image, ImageDraw
+
+        img = self.base_image().copy()
+        draw = ImageDraw.Draw(img)
+
+        # Every color the maze can use, so frames map onto it exactly
+        palette = Image.new("P", (1, 1))
+        palette.putpalette([
+            value for color in [
+                (0, 0, 0), (40, 40, 40), (255, 0, 0), (0, 171, 28),
+                (237, 240, 252), (212, 97, 85), (220, 235, 113)
+            ] for value in color
+        ])
+
+        def write(f, cells):
+            if cells is None:
+                box = (0, 0) + img.size
+            else:
+                cell_size = 50
+                box = (
+                    min(j for _, j in cells) * cell_size,
+                    min(i for i, _ in cells) * cell_size,
+                    (max(j for _, j in cells) + 1) * cell_size,
+                    (max(i for i, _ in cells) + 1) * cell_size
+                )
+            region = img.crop(box).convert("RGB").quantize(
+                palette=palette, dither=Image.Dither.NONE
+            )
+            for chunk in GifImagePlugin.getdata(region, offset=box[:2], duration=duration):
+                f.write(chunk)
+
+        explored = [
+            cell for cell in self.explored_order
+            if cell not in (self.start, self.goal)
+        ]
+        with open(filename, "wb") as f:
+            first = img.convert("RGB").quantize(palette=palette, dither=Image.Dither.NONE)
+            header, _ = GifImagePlugin.getheader(first, info={"loop": 0})
+            f.write(b"".join(header))
+            write(f, None)
+
+            for k in range(0, len(explored), step):
+                cells = explored[k:k + step]
+                for cell in cells:
+                    self.draw_cell(draw, cell, (212, 97, 85))
+                write(f, cells)
+
+            if self.solution is not None:
+                cells = [cell for cell in self.solution[1] if cell != self.goal]
+                for cell in cells:
+                    self.draw_cell(draw, cell, (220, 235, 113))
+                if cells:
+                    write(f, cells)
+
+            f.write(b";")
+
+
 if len(sys.argv) != 2:
     sys.exit("Usage: python maze.py maze.txt")
 
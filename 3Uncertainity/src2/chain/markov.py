@@ -0,0 +1,84 @@
+import numpy as np
+
+
+class MarkovChain():
+
+    def __init__(self, start, transitions):
+        """
+        Create a new Markov chain.
+
+        `start` is a dictionary mapping each state to its starting probability.
+        `transitions` is a list of [current, next, probability] rows, in the
+        same layout as a pomegranate ConditionalProbabilityTable.
+        """
+        self.states = list(start)
+        self.index = {state: i for i, state in enumerate(self.states)}
+        k = len(self.states)
+
+        self.start = np.array([start[state] for state in self.states], dtype=float)
+
+        # Transition matrix: row is today's state, column is tomorrow's
+        self.matrix = np.zeros((k, k))
+        for current, following, probability in transitions:
+            self.matrix[self.index[current], self.index[following]] = probability
+
+        if not np.isclose(self.start.sum(), 1):
+            raise ValueError("start probabilities must sum to 1")
+        if not np.allclose(self.matrix.sum(axis=1), 1):
+            raise ValueError("each row of transitions must sum to 1")
+
+        # Cumulative distributions used for inverse-CDF sampling
+        self.start_cdf = np.cumsum(self.start)
+        self.matrix_cdf = np.cumsum(self.matrix, axis=1)
+
+    def sample_indices(self, length, n=1, rng=None):
+        """
+        Returns an (n, length) array of state indices, one row per trajectory.
+        All `n` trajectories are advanced together, one step at a time.
+        """
+        rng = np.random.default_rng(rng)
+        paths = np.empty((n, length), dtype=np.intp)
+        if length == 0:
+            return paths
+
+        # Inverse-CDF: count how many cumulative values each draw exceeds
+        k = len(self.states)
+        draws = rng.random((n, length))
+        paths[:, 0] = np.minimum(
+            np.searchsorted(self.start_cdf, draws[:, 0], side="right"), k - 1
+        )
+        for t in range(1, length):
+            cdf = self.matrix_cdf[paths[:, t - 1]]
+            paths[:, t] = np.minimum(
+                (draws[:, t, None] >= cdf).sum(axis=1), k - 1
+            )
+        return paths
+
+    def sample(self, length, n=None, rng=None):
+        """
+        Samples a trajectory of `length` states.
+        If `n` is given, returns a list of `n` trajectories instead.
+        """
+        paths = self.sample_indices(length, 1 if n is None else n, rng=rng)
+        names = np.array(self.states, dtype=object)[paths]
+        if n is None:
+            return list(names[0])
+        return [list(row) for row in names]
+
+    def k_step(self, k):
+        """Returns the matrix of k-step transition probabilities."""
+        return np.linalg.matrix_power(self.matrix, k)
+
+    def distribution(self, k):
+        """Returns the distribution over states after `k` transitions."""
+        return dict(zip(self.states, (self.start @ self.k_step(k)).tolist()))
+
+    def stationary(self):
+        """
+        Returns the stationary distribution, i.e. the left eigenvector of the
+        transition matrix with eigenvalue 1, normalized to sum to 1.
+        """
+        values, vectors = np.linalg.eig(self.matrix.T)
+        vector = np.real(vectors[:, np.argmin(np.abs(values - 1))])
+        vector = vector / vector.sum()
+        return dict(zip(self.states, vector.tolist()))
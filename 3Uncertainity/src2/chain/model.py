@@ -1,21 +1,23 @@
-from pomegranate import DiscreteDistribution, ConditionalProbabilityTable, MarkovChain
+from markov import MarkovChain
 
 # Define starting probabilities
-start = DiscreteDistribution({
+start = {
     "sun": 0.5,
     "rain": 0.5
-})
+}
 
 # Define transition model
-transitions = ConditionalProbabilityTable([
+transitions = [
     ["sun", "sun", 0.8],
     ["sun", "rain", 0.2],
     ["rain", "sun", 0.3],
     ["rain", "rain", 0.7]
-], [start])
+]
 
 # Create Markov chain
-model = MarkovChain([start, transitions])
+model = MarkovChain(start, transitions)
 
-# Sample 50 states from chain
-print(model.sample(50))
+if __name__ == "__main__":
+
+    # Sample 50 states from chain
+    print(model.sample(50))
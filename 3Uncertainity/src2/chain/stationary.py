@@ -0,0 +1,14 @@
+from collections import Counter
+
+from model import model
+
+# Sample many long trajectories at once
+N = 10000
+paths = model.sample(100, n=N)
+print("Simulated (t = 100):", Counter(path[-1] for path in paths))
+
+# Answer the same question without simulation
+print("Exact (t = 100):", model.distribution(100))
+print("Stationary:", model.stationary())
+print("7-step transitions:")
+print(model.k_step(7))
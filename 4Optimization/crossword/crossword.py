@@ -3,6 +3,9 @@ class Variable():   # to represent a variable in a crossword puzzle
     ACROSS = "across"
     DOWN = "down"
 
+    # variables are hashed and compared constantly during search, so keep them compact
+    __slots__ = ("i", "j", "direction", "length", "cells", "hash_value")
+
     def __init__(self, i, j, direction, length):
         """Create a new variable with starting point, direction, and length."""
         self.i = i
@@ -15,9 +18,10 @@ class Variable():   # to represent a variable in a crossword puzzle
                 (self.i + (k if self.direction == Variable.DOWN else 0),
                  self.j + (k if self.direction == Variable.ACROSS else 0))
             )
+        self.hash_value = hash((self.i, self.j, self.direction, self.length))
 
     def __hash__(self):
-        return hash((self.i, self.j, self.direction, self.length))
+        return self.hash_value
 
     def __eq__(self, other):
         return (
@@ -35,6 +39,72 @@ class Variable():   # to represent a variable in a crossword puzzle
         return f"Variable({self.i}, {self.j}, {direction}, {self.length})"
 
 
+class WordIndex():  # to look up candidate words as integer bitsets
+
+    def __init__(self, words):
+        """
+        Give every word an integer id, and index the ids by word length and
+        by (word length, position, letter). A set of words is represented
+        as an integer whose bit k is set if word k is in the set.
+        """
+        self.words = sorted(words)
+        self.ids = {word: k for k, word in enumerate(self.words)}
+
+        self.all = (1 << len(self.words)) - 1
+        self.lengths = dict()  # maps a length to the bitset of words with that length
+        self.letters = dict()  # maps (length, position, letter) to a bitset of words
+        for k, word in enumerate(self.words):
+            bit = 1 << k
+            length = len(word)
+            self.lengths[length] = self.lengths.get(length, 0) | bit
+            for position, letter in enumerate(word):
+                key = (length, position, letter)
+                self.letters[key] = self.letters.get(key, 0) | bit
+
+        # the letters that appear at each (length, position)
+        self.alphabet = dict()
+        for length, position, letter in self.letters:
+            self.alphabet.setdefault((length, position), []).append(letter)
+
+    def bit(self, word):
+        """Return the bitset containing only `word`."""
+        return 1 << self.ids[word]
+
+    def with_length(self, length):
+        """Return the bitset of all words with the given length."""
+        return self.lengths.get(length, 0)
+
+    def with_letter(self, length, position, letter):
+        """Return the bitset of words of `length` with `letter` at `position`."""
+        return self.letters.get((length, position, letter), 0)
+
+    def supported(self, bits, length, position, other_length, other_position):
+        """
+        Return the bitset of words of `other_length` whose letter at
+        `other_position` matches the letter at `position` of some word of
+        `length` in `bits`.
+        """
+        result = 0
+        for letter in self.alphabet.get((length, position), ()):
+            if bits & self.letters[length, position, letter]:
+                result |= self.letters.get((other_length, other_position, letter), 0)
+        return result
+
+    def count(self, bits):
+        """Return the number of words in a bitset."""
+        return bits.bit_count()
+
+    def decode(self, bits):
+        """Return the list of words in a bitset."""
+        digits = bin(bits)[:1:-1]  # bit k is digit k
+        words = []
+        k = -1
+        for _ in range(bits.bit_count()):
+            k = digits.index("1", k + 1)
+            words.append(self.words[k])
+        return words
+
+
 class Crossword():  # to represent the puzzle itself
 
     def __init__(self, structure_file, words_file):
@@ -65,6 +135,9 @@ class Crossword():  # to represent the puzzle itself
             # a set of all of the words to draw from when constructing the crossword puzzle.
             self.words = set(f.read().upper().splitlines())
 
+        # an index of the words by length and by letter at each position
+        self.index = WordIndex(self.words)
+
         # Determine variable set
         self.variables = set()  # is a set of all of the variables in the puzzle (each is a Variable object).
         for i in range(self.height):
@@ -108,30 +181,43 @@ class Crossword():  # to represent the puzzle itself
                             length=length
                         ))
 
+        # Index which variables cover each cell, and at which position
+        # `cells` maps a cell (i, j) to a list of (variable, k) pairs
+        self.cells = dict()
+        for var in self.variables:
+            for k, cell in enumerate(var.cells):
+                self.cells.setdefault(cell, []).append((var, k))
+
         # Compute overlaps for each word
         # For any pair of variables v1, v2, their overlap is either:
         #    None, if the two variables do not overlap; or
         #    (i, j), where v1's ith character overlaps v2's jth character
-        self.overlaps = dict()  # is a dictionary mapping a pair of variables to their overlap.
-        for v1 in self.variables:
-            for v2 in self.variables:
-                if v1 == v2:
-                    continue
-                cells1 = v1.cells
-                cells2 = v2.cells
-                intersection = set(cells1).intersection(cells2)
-                if not intersection:
-                    self.overlaps[v1, v2] = None
-                else:
-                    intersection = intersection.pop()
-                    self.overlaps[v1, v2] = (
-                        cells1.index(intersection),
-                        cells2.index(intersection)
-                    )
+        # Only cells shared by two variables can produce an overlap, so only
+        # those pairs are stored; every other pair looks up as None.
+        self.overlaps = Overlaps()  # is a dictionary mapping a pair of variables to their overlap.
+        for shared in self.cells.values():
+            for v1, k1 in shared:
+                for v2, k2 in shared:
+                    if v1 != v2:
+                        self.overlaps[v1, v2] = (k1, k2)
+
+        # Adjacency lists, compiled once so the solver never rescans variables
+        # `links` maps a variable to a tuple of (neighbor, i, j) with overlap (i, j)
+        self.links = {var: [] for var in self.variables}
+        for (v1, v2), (k1, k2) in self.overlaps.items():
+            self.links[v1].append((v2, k1, k2))
+        self.links = {var: tuple(links) for var, links in self.links.items()}
+        self.adjacent = {
+            var: frozenset(neighbor for neighbor, _, _ in links)
+            for var, links in self.links.items()
+        }
 
     def neighbors(self, var):
         """Given a variable, return set of overlapping variables."""
-        return set(
-            v for v in self.variables
-            if v != var and self.overlaps[v, var]
-        )
+        return self.adjacent[var]
+
+
+class Overlaps(dict):  # overlaps of variable pairs; pairs that do not overlap map to None
+
+    def __missing__(self, key):
+        return None
@@ -1,20 +1,59 @@
+import random
 import sys
+import time
 
+from collections import deque
 from crossword import *  # Variable, Crossword
 
 
+class Restart(Exception):  # raised when a search uses up its failure limit
+    pass
+
+
+class OutOfTime(Exception):  # raised when a search passes its deadline
+    pass
+
+
 class CrosswordCreator():
 
-    def __init__(self, crossword):
+    def __init__(self, crossword, seed=None):
         """
         Create new CSP crossword generate.
+        If `seed` is given, ties between variables and between values are
+        broken at random, so differently seeded creators search differently.
         """
         self.crossword = crossword
+        self.index = crossword.index
+        self.random = random.Random(seed) if seed is not None else None
+
+        # limits checked by `search`; see `solve_randomized`
+        self.failures = 0
+        self.fail_limit = None
+        self.deadline = None
+
+        # each domain is a bitset of word ids (see WordIndex)
         self.domains = {
-            var: self.crossword.words.copy()
+            var: self.index.all
+            for var in self.crossword.variables
+        }
+
+        # the assigned variables responsible for each domain reduction
+        self.culprits = {
+            var: frozenset()
             for var in self.crossword.variables
         }
 
+        # (variable, old domain, old culprits) for every reduction, undone on backtrack
+        self.trail = []
+
+        # the variable whose domain was last emptied by `ac3`
+        self.wiped = None
+
+        # variables grouped by length; only these can compete for the same word
+        self.same_length = dict()
+        for var in self.crossword.variables:
+            self.same_length.setdefault(var.length, []).append(var)
+
     def letter_grid(self, assignment):
         """
         Return 2D array representing a given assignment.
@@ -90,9 +129,37 @@ class CrosswordCreator():
         Enforce node and arc consistency, and then solve the CSP.
         """
         self.enforce_node_consistency()
-        self.ac3()
+        if not self.ac3():
+            return None
         return self.backtrack(dict())
 
+    def solve_randomized(self, deadline=None, fail_limit=100, growth=1.5):
+        """
+        Like `solve`, but restart the search whenever it fails `fail_limit`
+        times, growing the limit by `growth` after each restart. Restarts
+        only help if the creator was given a seed.
+
+        Return None if there is no solution, or if the clock passes
+        `deadline` (a `time.time()` value) first.
+        """
+        self.enforce_node_consistency()
+        if not self.ac3():
+            return None
+
+        mark = len(self.trail)
+        self.deadline = deadline
+        while True:
+            self.failures = 0
+            self.fail_limit = fail_limit
+            try:
+                return self.backtrack(dict())
+            except Restart:
+                self.undo(mark)
+                fail_limit = int(fail_limit * growth) + 1
+            except OutOfTime:
+                self.undo(mark)
+                return None
+
     def enforce_node_consistency(self):
         """
         Update `self.domains` such that each variable is node-consistent.
@@ -100,9 +167,24 @@ class CrosswordCreator():
          constraints; in this case, the length of the word.)
         """
         for v in self.domains:
-            for word in self.domains[v].copy():
-                if len(word) != v.length:
-                    self.domains[v].remove(word)
+            self.prune(v, self.domains[v] & self.index.with_length(v.length))
+
+    def prune(self, var, domain, culprits=None):
+        """
+        Replace the domain of `var`, recording the old domain (and the
+        variables blamed for it) on the trail so `undo` can restore it.
+        """
+        self.trail.append((var, self.domains[var], self.culprits[var]))
+        self.domains[var] = domain
+        if culprits is not None:
+            self.culprits[var] = culprits
+
+    def undo(self, mark):
+        """Restore every domain reduced since the trail had length `mark`."""
+        while len(self.trail) > mark:
+            var, domain, culprits = self.trail.pop()
+            self.domains[var] = domain
+            self.culprits[var] = culprits
 
     def revise(self, x, y):
         """
@@ -113,16 +195,17 @@ class CrosswordCreator():
         Return True if a revision was made to the domain of `x`; return
         False if no revision was made.
         """
-        revised = False
         i, j = self.crossword.overlaps[x, y]
-        for word_x in self.domains[x].copy():
-            for word_y in self.domains[y]:
-                if word_x[i] == word_y[j]:  # constraint that the same square shared by overlapping
-                    break
-            else:  # executed if no word satisfied the constraint (i.e break statement was not executed)
-                self.domains[x].remove(word_x) 
-                revised = True
-        return revised
+
+        # words of `x` whose letter at the shared square matches some word of `y`
+        supported = self.index.supported(self.domains[y], y.length, j, x.length, i)
+        revised = self.domains[x] & supported
+        if revised == self.domains[x]:
+            return False
+
+        # whatever limited the domain of `y` is now also to blame for `x`
+        self.prune(x, revised, self.culprits[x] | self.culprits[y])
+        return True
 
     def ac3(self, arcs=None):
         """
@@ -134,15 +217,20 @@ class CrosswordCreator():
         return False if one or more domains end up empty.
         """
         # there exists an arc between a variable and it's neighboring variables
-        queue = arcs if arcs is not None else [(x, y) for x in self.crossword.variables for y in self.crossword.neighbors(x)]
+        queue = deque(arcs if arcs is not None else [(x, y) for x in self.crossword.variables for y in self.crossword.neighbors(x)])
+        queued = set(queue)  # arcs currently waiting in the queue
 
         while queue:
-            (x, y) = queue.pop(0)
+            (x, y) = queue.popleft()
+            queued.discard((x, y))
             if self.revise(x, y):
-                if len(self.domains[x]) == 0:
+                if not self.domains[x]:
+                    self.wiped = x
                     return False
-                for z in list(set(self.crossword.neighbors(x)) - set(self.domains[y])):
-                    queue.append((z, x))
+                for z, _, _ in self.crossword.links[x]:
+                    if z != y and (z, x) not in queued:
+                        queue.append((z, x))
+                        queued.add((z, x))
         return True
 
     def assignment_complete(self, assignment):
@@ -158,7 +246,7 @@ class CrosswordCreator():
         puzzle without conflicting characters); return False otherwise.
         """
         # 1. all values are distinct
-        if len(set(assignment)) != len(assignment):
+        if len(set(assignment.values())) != len(assignment):
             return False
 
         # 2. every value is the correct length
@@ -167,9 +255,8 @@ class CrosswordCreator():
 
         # 3. there are no conflicts between neighboring variables
         for var in assignment:
-            for neighbor in self.crossword.neighbors(var):
+            for neighbor, i, j in self.crossword.links[var]:
                 if neighbor in assignment:
-                    i, j = self.crossword.overlaps[var, neighbor]
                     if assignment[var][i] != assignment[neighbor][j]:
                         return False
 
@@ -182,12 +269,27 @@ class CrosswordCreator():
         The first value in the list, for example, should be the one
         that rules out the fewest values among the neighbors of `var`.
         """
-        values = dict()
-        for value in self.domains[var]:
-            values[value] = 0
-            for neighbor in self.crossword.neighbors(var) - set(assignment):
-                if value in self.domains[neighbor]:
-                    values[value] += 1
+        # For each unassigned neighbor, how many of its values each letter
+        # at the overlap would rule out, counted once per possible letter
+        ruled_out = []
+        for neighbor, i, j in self.crossword.links[var]:
+            if neighbor in assignment:
+                continue
+            domain = self.domains[neighbor]
+            size = self.index.count(domain)
+            ruled_out.append((i, {
+                letter: size - self.index.count(
+                    domain & self.index.with_letter(neighbor.length, j, letter)
+                )
+                for letter in self.index.alphabet.get((var.length, i), ())
+            }))
+
+        values = {
+            value: sum(counts[value[i]] for i, counts in ruled_out)
+            for value in self.index.decode(self.domains[var])
+        }
+        if self.random is not None:
+            return sorted(values, key=lambda value: (values[value], self.random.random()))
         return sorted(values, key=values.get)
 
     def select_unassigned_variable(self, assignment):
@@ -201,14 +303,16 @@ class CrosswordCreator():
         # Get a dictionary of elements that are unassigned i.e.
         # variables which are in `self.domains` but not in `assignment`
         unassigned_vars = {}
-        for var in self.crossword.variables - set(assignment):
-            unassigned_vars[var] = self.domains[var]
+        for var in self.crossword.variables:
+            if var not in assignment:
+                unassigned_vars[var] = self.index.count(self.domains[var])
 
-        # Get the variable with the fewest number of remaining values in its domain.    
+        # Get the variable with the fewest number of remaining values in its domain.
         # On tie, choosing among those variables having the largest degree (has the most neighbors)
         fewest = min(unassigned_vars.items(),       # sort the unassigned_vars dictionary
-                     key=lambda item: len(item[1]) and not  # based on lesser domain length
-                     len(self.crossword.neighbors(item[0])))  # and higher no of neighbors
+                     key=lambda item: (item[1],     # based on lesser domain length
+                     -len(self.crossword.neighbors(item[0])),  # and higher no of neighbors
+                     self.random.random() if self.random is not None else 0))  # and at random, if seeded
         return fewest[0]
  
     def backtrack(self, assignment):
@@ -220,26 +324,79 @@ class CrosswordCreator():
 
         If no assignment is possible, return None.
         """
+        solution, _ = self.search(assignment)
+        return solution
+
+    def search(self, assignment):
+        """
+        Backtracking search maintaining arc consistency, with
+        conflict-directed backjumping.
+
+        `assignment` is extended and shrunk in place, and every domain
+        reduction is recorded on the trail and undone on failure, so no
+        assignment or domain is ever copied.
+
+        Return (assignment, None) on success, or (None, conflict) where
+        `conflict` is the set of assigned variables to blame for the
+        failure. If the variable assigned at this level is not in the
+        conflict set, trying its other values cannot help, so the caller
+        returns immediately and the search jumps back further.
+        """
         # Check if assignment is complete
         if self.assignment_complete(assignment):
-            return assignment
+            return assignment, None
+        if self.deadline is not None and time.time() > self.deadline:
+            raise OutOfTime
 
-        # Try a new variable
+        # Try a new variable; whatever already limited its domain shares the blame
         var = self.select_unassigned_variable(assignment)
-        arcs = [(neighbor, var) for neighbor in self.crossword.neighbors(var) if not neighbor in assignment]
+        conflict = set(self.culprits[var])
         for value in self.order_domain_values(var, assignment):
-            new_assignment = assignment.copy()
-            new_assignment[var] = value
-            # Makes sure that the new assignment is consistent and also apply inferences
-            if self.consistent(new_assignment) and self.ac3(arcs):
-                for unassigned_var in list(set(self.crossword.variables) - set(new_assignment)):
-                    if len(self.domains[unassigned_var]) == 1:
-                        new_assignment[unassigned_var] = self.domains[unassigned_var][0]
-                result = self.backtrack(new_assignment)
+            mark = len(self.trail)
+            assignment[var] = value
+
+            failure = self.infer(var, value, assignment)
+            if failure is None:
+                result, failure = self.search(assignment)
                 if result is not None:  # Not a failure
-                    return result
-    
-        return None  # Every values was tried on; yet nothing worked; i.e. no solution
+                    return result, None
+
+            del assignment[var]
+            self.undo(mark)
+
+            # `var` played no part in the failure: jump back past it
+            if var not in failure:
+                return None, failure
+            conflict |= failure - {var}
+
+        self.failures += 1
+        if self.fail_limit is not None and self.failures > self.fail_limit:
+            raise Restart
+        return None, conflict  # Every values was tried on; yet nothing worked; i.e. no solution
+
+    def infer(self, var, value, assignment):
+        """
+        Reduce domains after assigning `value` to `var`: the word is taken
+        by `var` alone, and arc consistency is restored around it.
+
+        Return None if no domain is emptied, otherwise the set of assigned
+        variables to blame.
+        """
+        bit = self.index.bit(value)
+        self.prune(var, bit, self.culprits[var] | {var})
+
+        # All words are distinct
+        for other in self.same_length[var.length]:
+            if other is var or other in assignment or not self.domains[other] & bit:
+                continue
+            self.prune(other, self.domains[other] & ~bit, self.culprits[other] | {var})
+            if not self.domains[other]:
+                return self.culprits[other]
+
+        arcs = [(neighbor, var) for neighbor, _, _ in self.crossword.links[var] if not neighbor in assignment]
+        if not self.ac3(arcs):
+            return self.culprits[self.wiped]
+        return None
 
 
 def main():
@@ -0,0 +1,121 @@
+import multiprocessing
+import os
+import sys
+import time
+
+from crossword import Crossword
+from generate import CrosswordCreator
+
+# the crossword loaded once in each worker process
+crossword = None
+
+
+def main():
+
+    # Check usage
+    if len(sys.argv) not in [3, 4, 5]:
+        sys.exit("Usage: python portfolio.py structure words [count] [seconds]")
+
+    # Parse command-line arguments
+    structure = sys.argv[1]
+    words = sys.argv[2]
+    count = int(sys.argv[3]) if len(sys.argv) >= 4 else 1
+    seconds = float(sys.argv[4]) if len(sys.argv) == 5 else None
+
+    # Print one fill, or stream many
+    creator = CrosswordCreator(Crossword(structure, words))
+    if count == 1:
+        assignment = solve(structure, words, seconds=seconds)
+        if assignment is None:
+            print("No solution.")
+        else:
+            creator.print(assignment)
+        return
+
+    found = 0
+    for assignment in fills(structure, words, count=count, seconds=seconds or 60):
+        found += 1
+        print(f"Fill {found}:")
+        creator.print(assignment)
+        print()
+    if not found:
+        print("No solution.")
+
+
+def load(structure, words):
+    """Load the crossword once per worker process."""
+    global crossword
+    crossword = Crossword(structure, words)
+
+
+def attempt(seed, deadline):
+    """Run one randomized search with restarts in a worker process."""
+    return CrosswordCreator(crossword, seed=seed).solve_randomized(deadline=deadline)
+
+
+def solve(structure, words, workers=None, seconds=None):
+    """
+    Launch differently seeded searches across a pool of processes and
+    return whichever solution is found first; the other searches are
+    terminated. Return None if there is no solution, or none is found
+    within `seconds`.
+    """
+    workers = workers or os.cpu_count()
+    deadline = time.time() + seconds if seconds is not None else None
+    with multiprocessing.Pool(workers, initializer=load, initargs=(structure, words)) as pool:
+        pending = [
+            pool.apply_async(attempt, (seed, deadline))
+            for seed in range(workers)
+        ]
+
+        # Take the first answer; exiting the pool terminates the rest.
+        # Every search is complete, so one that fails in time proves there is no solution.
+        while pending:
+            done = [result for result in pending if result.ready()]
+            if not done:
+                time.sleep(0.01)
+                continue
+            return done[0].get()
+    return None
+
+
+def fills(structure, words, count=None, seconds=60, workers=None):
+    """
+    Generate up to `count` distinct fills of the structure until `seconds`
+    have passed, running differently seeded searches across a pool of
+    processes. Fills that repeat an earlier one are skipped.
+    """
+    workers = workers or os.cpu_count()
+    deadline = time.time() + seconds
+    seen = set()
+    seed = 0
+    with multiprocessing.Pool(workers, initializer=load, initargs=(structure, words)) as pool:
+
+        # Keep every worker busy with a new seed
+        pending = []
+        while time.time() < deadline and (count is None or len(seen) < count):
+            while len(pending) < workers:
+                pending.append(pool.apply_async(attempt, (seed, deadline)))
+                seed += 1
+
+            done = [result for result in pending if result.ready()]
+            if not done:
+                time.sleep(0.01)
+                continue
+            for result in done:
+                pending.remove(result)
+                assignment = result.get()
+                if assignment is None:
+
+                    # A search that failed before the deadline proves there is no fill
+                    if time.time() < deadline:
+                        return
+                    continue
+                fill = frozenset(assignment.items())
+                if fill not in seen and (count is None or len(seen) < count):
+                    seen.add(fill)
+                    yield assignment
+
+
+if __name__ == "__main__":
+    main()
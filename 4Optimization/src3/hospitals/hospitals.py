@@ -1,4 +1,6 @@
+import math
 import random
+import time
 
 
 class Space():
@@ -10,11 +12,15 @@ class Space():
         self.num_hospitals = num_hospitals
         self.houses = set()
         self.hospitals = set()
+        self.renderer = None
 
     def add_house(self, row, col):
         """Add a house at a particular location in state space."""
         self.houses.add((row, col))
 
+        # Houses are drawn into the renderer's base layer
+        self.close_images()
+
     def available_spaces(self):
         """Returns all cells not currently used by a house or hospital."""
 
@@ -32,9 +38,13 @@ class Space():
             candidates.remove(hospital)
         return candidates
 
-    def hill_climb(self, maximum=None, image_prefix=None, log=False):
-        """Performs hill-climbing to find a solution."""
+    def hill_climb(self, maximum=None, image_prefix=None, log=False, trace=None):
+        """
+        Performs hill-climbing to find a solution.
+        If `trace` is a list, (seconds elapsed, cost) pairs are appended to it.
+        """
         count = 0
+        started = time.perf_counter()
 
         # Start by initializing hospitals randomly
         self.hospitals = set()
@@ -45,6 +55,13 @@ class Space():
         if image_prefix:
             self.output_image(f"{image_prefix}{str(count).zfill(3)}.png")
 
+        # Cache each house's nearest and second-nearest hospital distances
+        houses = list(self.houses)
+        nearest = self.nearest_hospitals(houses, self.hospitals)
+        current_cost = sum(first for first, _, _ in nearest)
+        if trace is not None:
+            trace.append((time.perf_counter() - started, current_cost))
+
         # Continue until we reach maximum number of iterations
         while maximum is None or count < maximum:
             count += 1
@@ -57,28 +74,32 @@ class Space():
                 # Consider all neighbors for that hospital
                 for replacement in self.get_neighbors(*hospital):
 
-                    # Generate a neighboring set of hospitals
-                    neighbor = self.hospitals.copy()
-                    neighbor.remove(hospital)
-                    neighbor.add(replacement)
-
                     # Check if neighbor is best so far
-                    cost = self.get_cost(neighbor)
+                    cost = self.move_cost(
+                        houses, nearest, hospital, replacement
+                    )
                     if best_neighbor_cost is None or cost < best_neighbor_cost:
                         best_neighbor_cost = cost
-                        best_neighbors = [neighbor]
+                        best_neighbors = [(hospital, replacement)]
                     elif best_neighbor_cost == cost:
-                        best_neighbors.append(neighbor)
+                        best_neighbors.append((hospital, replacement))
 
             # None of the neighbors are better than the current state
-            if best_neighbor_cost >= self.get_cost(self.hospitals):
+            if best_neighbor_cost is None or best_neighbor_cost >= current_cost:
                 return self.hospitals
 
             # Move to a highest-valued neighbor
             else:
                 if log:
                     print(f"Found better neighbor: cost {best_neighbor_cost}")
-                self.hospitals = random.choice(best_neighbors)
+                hospital, replacement = random.choice(best_neighbors)
+                self.hospitals = self.hospitals.copy()
+                self.hospitals.remove(hospital)
+                self.hospitals.add(replacement)
+                nearest = self.nearest_hospitals(houses, self.hospitals)
+                current_cost = best_neighbor_cost
+                if trace is not None:
+                    trace.append((time.perf_counter() - started, current_cost))
 
             # Generate image
             if image_prefix:
@@ -107,6 +128,70 @@ class Space():
 
         return best_hospitals
 
+    def simulated_annealing(self, maximum=1000, schedule=None,
+                            image_prefix=None, log=False, trace=None):
+        """
+        Performs simulated annealing to find a solution.
+        `schedule` maps the step number to a temperature; it defaults to
+        `exponential_schedule()`. Returns the best state seen.
+        If `trace` is a list, (seconds elapsed, cost) pairs are appended to it.
+        """
+        if schedule is None:
+            schedule = exponential_schedule()
+        started = time.perf_counter()
+
+        # Start by initializing hospitals randomly
+        self.hospitals = set()
+        for _ in range(self.num_hospitals):
+            self.hospitals.add(random.choice(list(self.available_spaces())))
+        houses = list(self.houses)
+        nearest = self.nearest_hospitals(houses, self.hospitals)
+        current_cost = sum(first for first, _, _ in nearest)
+        best_hospitals, best_cost = self.hospitals.copy(), current_cost
+        if log:
+            print("Initial state: cost", current_cost)
+        if trace is not None:
+            trace.append((time.perf_counter() - started, current_cost))
+        if image_prefix:
+            self.output_image(f"{image_prefix}{str(0).zfill(3)}.png")
+
+        for t in range(1, maximum + 1):
+            temperature = schedule(t)
+            if temperature <= 0:
+                break
+
+            # Choose a random neighbor of a random hospital
+            hospital = random.choice(list(self.hospitals))
+            neighbors = self.get_neighbors(*hospital)
+            if not neighbors:
+                continue
+            replacement = random.choice(neighbors)
+
+            # Always accept improvements, accept worse states with probability e^(-ΔE/T)
+            cost = self.move_cost(houses, nearest, hospital, replacement)
+            delta = cost - current_cost
+            if delta > 0 and random.random() >= math.exp(-delta / temperature):
+                continue
+
+            self.hospitals = self.hospitals.copy()
+            self.hospitals.remove(hospital)
+            self.hospitals.add(replacement)
+            nearest = self.nearest_hospitals(houses, self.hospitals)
+            current_cost = cost
+
+            if current_cost < best_cost:
+                best_hospitals, best_cost = self.hospitals.copy(), current_cost
+                if log:
+                    print(f"{t}: Found new best state: cost {best_cost}")
+                if trace is not None:
+                    trace.append((time.perf_counter() - started, best_cost))
+
+            if image_prefix:
+                self.output_image(f"{image_prefix}{str(t).zfill(3)}.png")
+
+        self.hospitals = best_hospitals
+        return self.hospitals
+
     def get_cost(self, hospitals):
         """Calculates sum of distances from houses to nearest hospital."""
         cost = 0
@@ -117,6 +202,42 @@ class Space():
             )
         return cost
 
+    def nearest_hospitals(self, houses, hospitals):
+        """
+        Returns, for each house in `houses`, a tuple of the distance to its
+        nearest hospital, the distance to its second-nearest hospital, and
+        the nearest hospital itself.
+        """
+        nearest = []
+        for house in houses:
+            first = second = float("inf")
+            closest = None
+            for hospital in hospitals:
+                distance = abs(house[0] - hospital[0]) + abs(house[1] - hospital[1])
+                if distance < first:
+                    first, second, closest = distance, first, hospital
+                elif distance < second:
+                    second = distance
+            nearest.append((first, second, closest))
+        return nearest
+
+    def move_cost(self, houses, nearest, hospital, replacement):
+        """
+        Calculates the cost after moving `hospital` to `replacement`,
+        using the cache from `nearest_hospitals` instead of rescanning
+        every hospital for every house.
+        """
+        cost = 0
+        for house, (first, second, closest) in zip(houses, nearest):
+            distance = abs(house[0] - replacement[0]) + abs(house[1] - replacement[1])
+
+            # A house served by the moved hospital falls back to its second choice
+            if closest == hospital:
+                cost += min(second, distance)
+            else:
+                cost += min(first, distance)
+        return cost
+
     def get_neighbors(self, row, col):
         """Returns neighbors not already containing a house or hospital."""
         candidates = [
@@ -134,67 +255,69 @@ class Space():
         return neighbors
 
     def output_image(self, filename):
-        """Generates image with all houses and hospitals."""
-        from PIL import Image, ImageDraw, ImageFont
-        cell_size = 100
-        cell_border = 2
-        cost_size = 40
-        padding = 10
-
-        # Create a blank canvas
-        img = Image.new(
-            "RGBA",
-            (self.width * cell_size,
-             self.height * cell_size + cost_size + padding * 2),
-            "white"
-        )
-        house = Image.open("assets/images/House.png").resize(
-            (cell_size, cell_size)
-        )
-        hospital = Image.open("assets/images/Hospital.png").resize(
-            (cell_size, cell_size)
-        )
-        font = ImageFont.truetype("assets/fonts/OpenSans-Regular.ttf", 30)
-        draw = ImageDraw.Draw(img)
-
-        for i in range(self.height):
-            for j in range(self.width):
-
-                # Draw cell
-                rect = [
-                    (j * cell_size + cell_border,
-                     i * cell_size + cell_border),
-                    ((j + 1) * cell_size - cell_border,
-                     (i + 1) * cell_size - cell_border)
-                ]
-                draw.rectangle(rect, fill="black")
-
-                if (i, j) in self.houses:
-                    img.paste(house, rect[0], house)
-                if (i, j) in self.hospitals:
-                    img.paste(hospital, rect[0], hospital)
-
-        # Add cost
-        draw.rectangle(
-            (0, self.height * cell_size, self.width * cell_size,
-             self.height * cell_size + cost_size + padding * 2),
-            "black"
-        )
-        draw.text(
-            (padding, self.height * cell_size + padding),
-            f"Cost: {self.get_cost(self.hospitals)}",
-            fill="white",
-            font=font
-        )
-
-        img.save(filename)
-
-
-# Create a new space and add houses randomly
-s = Space(height=10, width=20, num_hospitals=3)
-for i in range(15):
-    s.add_house(random.randrange(s.height), random.randrange(s.width))
-
-# Use local search to determine hospital placement
-hospitals = s.hill_climb(image_prefix="hospitals", log=True)
-#Random restart: hospitals = s.random_restart(20, image_prefix="hospitals", log=True)
+        """
+        Generates image with all houses and hospitals.
+        Images are rendered incrementally and written in the background;
+        call `close_images` to wait for them to finish.
+        """
+        if self.renderer is None:
+            from render import Renderer
+            self.renderer = Renderer(self)
+        self.renderer.save(filename, self.hospitals, self.get_cost(self.hospitals))
+
+    def record_animation(self, filename, duration=200):
+        """
+        Collects all following images into one animated GIF instead of
+        separate files. The GIF is written by `close_images`.
+        """
+        from render import Renderer
+        self.close_images()
+        self.renderer = Renderer(self, animation=filename, duration=duration)
+
+    def close_images(self):
+        """Waits for pending images to be written."""
+        if self.renderer is not None:
+            self.renderer.close()
+            self.renderer = None
+
+    def __getstate__(self):
+        """Leaves the renderer behind when a space is sent to another process."""
+        state = self.__dict__.copy()
+        state["renderer"] = None
+        return state
+
+
+def exponential_schedule(start=20, decay=0.995, minimum=0.01):
+    """
+    Returns a schedule where temperature decays geometrically,
+    stopping once it drops below `minimum`.
+    """
+    def schedule(t):
+        temperature = start * decay ** t
+        return temperature if temperature > minimum else 0
+    return schedule
+
+
+def linear_schedule(start=20, steps=1000):
+    """Returns a schedule where temperature falls linearly to zero."""
+    return lambda t: start * (1 - t / steps)
+
+
+def logarithmic_schedule(start=20):
+    """Returns a schedule where temperature falls as start / log(t + 1)."""
+    return lambda t: start / math.log(t + 1)
+
+
+if __name__ == "__main__":
+
+    # Create a new space and add houses randomly
+    s = Space(height=10, width=20, num_hospitals=3)
+    for i in range(15):
+        s.add_house(random.randrange(s.height), random.randrange(s.width))
+
+    # Use local search to determine hospital placement
+    hospitals = s.hill_climb(image_prefix="hospitals", log=True)
+    #Random restart: hospitals = s.random_restart(20, image_prefix="hospitals", log=True)
+    #Simulated annealing: hospitals = s.simulated_annealing(2000, log=True)
+    #Single GIF: s.record_animation("hospitals.gif"), then pass image_prefix as above
+    s.close_images()
@@ -0,0 +1,98 @@
+import os
+import random
+import sys
+import time
+
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+from hospitals import Space, exponential_schedule, linear_schedule, logarithmic_schedule
+
+SCHEDULES = {
+    "exponential": exponential_schedule,
+    "linear": linear_schedule,
+    "logarithmic": logarithmic_schedule
+}
+
+
+def main():
+    if len(sys.argv) not in [3, 4]:
+        sys.exit("Usage: python local_search.py (hill_climb|anneal) restarts [schedule]")
+    mode = sys.argv[1]
+    restarts = int(sys.argv[2])
+    schedule = sys.argv[3] if len(sys.argv) == 4 else "exponential"
+
+    # Create a large space and add houses randomly
+    space = Space(height=50, width=100, num_hospitals=8)
+    for i in range(1000):
+        space.add_house(random.randrange(space.height), random.randrange(space.width))
+
+    hospitals, cost, trace = search(
+        space, restarts, mode=mode, schedule=schedule, log=True
+    )
+    print(f"Best cost: {cost}")
+    print(f"Hospitals: {sorted(hospitals)}")
+    print("Cost vs. time:")
+    for elapsed, best in trace:
+        print(f"  {elapsed:8.3f}s  {best}")
+
+
+def search(space, restarts, mode="hill_climb", schedule="exponential",
+           maximum=None, workers=None, seed=None, log=False):
+    """
+    Runs `restarts` independent local searches of `space` across a pool of
+    worker processes, each with its own random seed, and keeps the best.
+
+    `mode` is either "hill_climb" or "anneal"; `schedule` names one of
+    SCHEDULES and is only used when annealing.
+
+    Returns a tuple (hospitals, cost, trace), where `trace` is a list of
+    (seconds elapsed, best cost so far) pairs, one per finished restart.
+    """
+    if mode not in ["hill_climb", "anneal"]:
+        raise ValueError(f"unknown mode: {mode}")
+    if schedule not in SCHEDULES:
+        raise ValueError(f"unknown schedule: {schedule}")
+
+    # Derive independent seeds for every restart from one master seed
+    seeds = random.Random(seed).sample(range(2 ** 32), restarts)
+
+    best_hospitals = None
+    best_cost = None
+    trace = []
+    started = time.perf_counter()
+    with ProcessPoolExecutor(max_workers=workers or os.cpu_count()) as executor:
+        futures = [
+            executor.submit(run, space, mode, schedule, maximum, s)
+            for s in seeds
+        ]
+        for i, future in enumerate(as_completed(futures)):
+            hospitals, cost = future.result()
+            if best_cost is None or cost < best_cost:
+                best_cost = cost
+                best_hospitals = hospitals
+                if log:
+                    print(f"{i}: Found new best state: cost {cost}")
+            elif log:
+                print(f"{i}: Found state: cost {cost}")
+            trace.append((time.perf_counter() - started, best_cost))
+
+    return best_hospitals, best_cost, trace
+
+
+def run(space, mode, schedule, maximum, seed):
+    """
+    Performs a single local search in a worker process.
+    Returns the resulting hospitals and their cost.
+    """
+    random.seed(seed)
+    if mode == "hill_climb":
+        hospitals = space.hill_climb(maximum=maximum)
+    else:
+        hospitals = space.simulated_annealing(
+            maximum=maximum or 10000, schedule=SCHEDULES[schedule]()
+        )
+    return hospitals, space.get_cost(hospitals)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,161 @@
+import os
+
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from PIL import GifImagePlugin, Image, ImageDraw, ImageFont
+
+ASSETS = os.path.join(os.path.dirname(os.path.abspath(__file__)), "assets")
+
+
+class Renderer():
+
+    def __init__(self, space, animation=None, duration=200, workers=2):
+        """
+        Create a renderer for a state space.
+
+        Assets are decoded once and the cells and houses are drawn once
+        into a base layer; each frame only repaints cells whose hospital
+        changed. Frames are written to disk by a background thread pool,
+        at most two per worker in flight. If `animation` names a file,
+        frames are instead appended to an animated GIF as they arrive,
+        each as just the region that changed, and `close()` finishes it.
+        """
+        self.space = space
+        self.cell_size = 100
+        self.cell_border = 2
+        self.cost_size = 40
+        self.padding = 10
+
+        size = (self.cell_size, self.cell_size)
+        self.house = Image.open(os.path.join(ASSETS, "images", "House.png")).resize(size)
+        self.hospital = Image.open(os.path.join(ASSETS, "images", "Hospital.png")).resize(size)
+        self.font = ImageFont.truetype(
+            os.path.join(ASSETS, "fonts", "OpenSans-Regular.ttf"), 30
+        )
+
+        self.base = self.draw_base()
+        self.canvas = self.base.copy()
+        self.draw = ImageDraw.Draw(self.canvas)
+        self.drawn = set()
+        self.dirty = []
+
+        self.animation = animation
+        self.duration = duration
+        self.gif = None
+        self.palette = None
+        self.workers = workers
+        self.executor = ThreadPoolExecutor(max_workers=workers)
+        self.pending = deque()
+
+    def draw_base(self):
+        """Draws the empty grid with all houses and a blank cost bar."""
+        space = self.space
+        img = Image.new(
+            "RGBA",
+            (space.width * self.cell_size,
+             space.height * self.cell_size + self.cost_size + self.padding * 2),
+            "white"
+        )
+        draw = ImageDraw.Draw(img)
+        for i in range(space.height):
+            for j in range(space.width):
+                origin = self.cell_origin(i, j)
+                draw.rectangle(
+                    [origin,
+                     ((j + 1) * self.cell_size - self.cell_border,
+                      (i + 1) * self.cell_size - self.cell_border)],
+                    fill="black"
+                )
+                if (i, j) in space.houses:
+                    img.paste(self.house, origin, self.house)
+
+        draw.rectangle(self.cost_box(), "black")
+        return img
+
+    def cell_origin(self, i, j):
+        """Returns the top-left pixel of cell (i, j)."""
+        return (j * self.cell_size + self.cell_border,
+                i * self.cell_size + self.cell_border)
+
+    def cost_box(self):
+        """Returns the pixel box of the cost bar below the grid."""
+        space = self.space
+        return (0, space.height * self.cell_size, space.width * self.cell_size,
+                space.height * self.cell_size + self.cost_size + self.padding * 2)
+
+    def restore(self, box):
+        """Copies a region of the base layer back onto the canvas."""
+        self.canvas.paste(self.base.crop(box), box[:2])
+
+    def update(self, hospitals, cost):
+        """Repaints only the cells whose hospital changed, and the cost."""
+        for i, j in self.drawn ^ hospitals:
+            x, y = self.cell_origin(i, j)
+            self.dirty.append((x, y, x + self.cell_size, y + self.cell_size))
+        for i, j in self.drawn - hospitals:
+            x, y = self.cell_origin(i, j)
+            self.restore((x, y, x + self.cell_size, y + self.cell_size))
+        for i, j in hospitals - self.drawn:
+            self.canvas.paste(self.hospital, self.cell_origin(i, j), self.hospital)
+        self.drawn = set(hospitals)
+
+        self.dirty.append(self.cost_box())
+        self.restore(self.cost_box())
+        self.draw.text(
+            (self.padding, self.space.height * self.cell_size + self.padding),
+            f"Cost: {cost}",
+            fill="white",
+            font=self.font
+        )
+
+    def save(self, filename, hospitals, cost):
+        """
+        Renders a frame and queues it to be written, only blocking while
+        too many earlier frames are still being written.
+        """
+        self.update(hospitals, cost)
+        if self.animation:
+            self.append_frame()
+            return
+        while len(self.pending) >= 2 * self.workers:
+            self.pending.popleft().result()
+        frame = self.canvas.copy()
+        self.pending.append(self.executor.submit(frame.save, filename))
+
+    def append_frame(self):
+        """
+        Writes the region of the canvas that changed since the last frame
+        to the GIF, mapped onto the palette chosen for the first frame.
+        """
+        if self.gif is None:
+
+            # The first frame is written whole and fixes the global palette
+            self.palette = self.canvas.convert("RGB").quantize(256)
+            header, _ = GifImagePlugin.getheader(self.palette.copy(), info={"loop": 0})
+            self.gif = open(self.animation, "wb")
+            self.gif.write(b"".join(header))
+            box = (0, 0) + self.canvas.size
+        else:
+            width, height = self.canvas.size
+            box = (
+                min(b[0] for b in self.dirty), min(b[1] for b in self.dirty),
+                min(max(b[2] for b in self.dirty), width),
+                min(max(b[3] for b in self.dirty), height)
+            )
+        self.dirty = []
+
+        region = self.canvas.crop(box).convert("RGB").quantize(
+            palette=self.palette, dither=Image.Dither.NONE
+        )
+        for chunk in GifImagePlugin.getdata(region, offset=box[:2], duration=self.duration):
+            self.gif.write(chunk)
+
+    def close(self):
+        """Waits for queued frames and finishes the animation, if any."""
+        while self.pending:
+            self.pending.popleft().result()
+        self.executor.shutdown()
+        if self.gif is not None:
+            self.gif.write(b";")
+            self.gif.close()
+            self.gif = None
@@ -0,0 +1,221 @@
+"""
+Constraint satisfaction problems with binary constraints.
+
+Backtracking search with AC-3 preprocessing, MRV and degree heuristics for
+choosing variables, least-constraining-value ordering and forward checking.
+"""
+
+from collections import deque
+
+
+def different(x, y):
+    """The default constraint: both variables take different values."""
+    return x != y
+
+
+class CSP():
+
+    def __init__(self):
+        """Create a new problem with no variables."""
+        self.variables = []
+        self.domains = dict()
+
+        # Mapping from variable to {neighbor: [constraints]}
+        self.constraints = dict()
+
+    def add_variable(self, variable, domain):
+        """Add a variable that can take any value in `domain`."""
+        if variable in self.domains:
+            raise ValueError(f"duplicate variable: {variable}")
+        self.variables.append(variable)
+        self.domains[variable] = list(domain)
+        self.constraints[variable] = dict()
+
+    def add_variables(self, variables, domain):
+        """Add several variables sharing the same domain."""
+        for variable in variables:
+            self.add_variable(variable, domain)
+
+    def add_constraint(self, x, y, constraint=different):
+        """
+        Add a binary constraint between `x` and `y`.
+        `constraint(value_x, value_y)` returns True if the pair is allowed.
+        """
+        self.constraints[x].setdefault(y, []).append(constraint)
+        self.constraints[y].setdefault(x, []).append(
+            lambda value_y, value_x: constraint(value_x, value_y)
+        )
+
+    def neighbors(self, x):
+        """Returns all variables sharing a constraint with `x`."""
+        return self.constraints[x].keys()
+
+    def satisfied(self, x, value_x, y, value_y):
+        """Checks whether `x = value_x` and `y = value_y` violate no constraint."""
+        return all(
+            constraint(value_x, value_y)
+            for constraint in self.constraints[x][y]
+        )
+
+    def revise(self, domains, x, y):
+        """
+        Make `x` arc consistent with `y` by removing values of `x` that
+        have no supporting value in the domain of `y`.
+        Returns True if the domain of `x` changed.
+        """
+        revised = False
+        for value_x in list(domains[x]):
+            if not any(self.satisfied(x, value_x, y, value_y) for value_y in domains[y]):
+                domains[x].remove(value_x)
+                revised = True
+        return revised
+
+    def ac3(self, domains, arcs=None):
+        """
+        Enforce arc consistency on `domains`, starting from `arcs`, or
+        from every arc if none are given.
+        Returns False if some domain ends up empty.
+        """
+        if arcs is None:
+            arcs = [(x, y) for x in self.variables for y in self.neighbors(x)]
+        queue = deque(arcs)
+        queued = set(queue)
+        while queue:
+            x, y = queue.popleft()
+            queued.discard((x, y))
+            if self.revise(domains, x, y):
+                if not domains[x]:
+                    return False
+                for z in self.neighbors(x):
+                    if z != y and (z, x) not in queued:
+                        queue.append((z, x))
+                        queued.add((z, x))
+        return True
+
+    def select_unassigned_variable(self, unassigned, domains, degrees):
+        """
+        Chooses the unassigned variable with the fewest remaining values,
+        breaking ties by the most constraints on other unassigned variables.
+        `degrees` maps each variable to its number of unassigned neighbors.
+        """
+        return min(
+            unassigned,
+            key=lambda variable: (len(domains[variable]), -degrees[variable])
+        )
+
+    def order_domain_values(self, var, unassigned, domains):
+        """
+        Orders the values of `var` by how few values they would rule out
+        for unassigned neighbors, least constraining first.
+        """
+        def eliminated(value):
+            return sum(
+                1
+                for y in self.neighbors(var) if y in unassigned
+                for value_y in domains[y]
+                if not self.satisfied(var, value, y, value_y)
+            )
+        values = [value for value in self.domains[var] if value in domains[var]]
+        return sorted(values, key=eliminated)
+
+    def forward_check(self, var, value, unassigned, domains):
+        """
+        Removes values of unassigned neighbors that conflict with
+        `var = value`. Returns the list of removed (variable, value) pairs,
+        or None, with nothing removed, if some domain would be wiped out.
+        """
+        removals = []
+        for y in self.neighbors(var):
+            if y not in unassigned:
+                continue
+            for value_y in list(domains[y]):
+                if not self.satisfied(var, value, y, value_y):
+                    domains[y].remove(value_y)
+                    removals.append((y, value_y))
+            if not domains[y]:
+                self.restore(domains, removals)
+                return None
+        return removals
+
+    def restore(self, domains, removals):
+        """Puts back values removed by `forward_check`."""
+        for y, value_y in removals:
+            domains[y].add(value_y)
+
+    def assign(self, var, unassigned, degrees):
+        """Marks `var` as assigned."""
+        unassigned.remove(var)
+        for y in self.neighbors(var):
+            degrees[y] -= 1
+
+    def unassign(self, var, unassigned, degrees):
+        """Marks `var` as unassigned again."""
+        unassigned.add(var)
+        for y in self.neighbors(var):
+            degrees[y] += 1
+
+    def all_solutions(self):
+        """
+        Generates every complete, consistent assignment.
+
+        The search is iterative rather than recursive, so problems with
+        thousands of variables do not hit Python's recursion limit.
+        """
+        domains = {
+            variable: set(domain)
+            for variable, domain in self.domains.items()
+        }
+        if not self.ac3(domains):
+            return
+
+        assignment = dict()
+        unassigned = set(self.variables)
+        degrees = {
+            variable: len(self.constraints[variable])
+            for variable in self.variables
+        }
+        if not unassigned:
+            yield assignment
+            return
+
+        # Each frame holds a variable, its remaining values, and the
+        # removals made by the value currently assigned to it
+        var = self.select_unassigned_variable(unassigned, domains, degrees)
+        self.assign(var, unassigned, degrees)
+        stack = [[var, iter(self.order_domain_values(var, unassigned, domains)), None]]
+
+        while stack:
+            frame = stack[-1]
+            var, values, removals = frame
+
+            # Undo the previous value of this variable
+            if removals is not None:
+                self.restore(domains, removals)
+                del assignment[var]
+                frame[2] = None
+
+            # Try the next value that leaves every neighbor a value
+            for value in values:
+                removals = self.forward_check(var, value, unassigned, domains)
+                if removals is not None:
+                    assignment[var] = value
+                    frame[2] = removals
+                    break
+            else:
+                stack.pop()
+                self.unassign(var, unassigned, degrees)
+                continue
+
+            # Complete assignment found
+            if not unassigned:
+                yield dict(assignment)
+                continue
+
+            # Otherwise extend the assignment
+            var = self.select_unassigned_variable(unassigned, domains, degrees)
+            self.assign(var, unassigned, degrees)
+            stack.append([var, iter(self.order_domain_values(var, unassigned, domains)), None])
+
+    def solve(self):
+        """Returns one solution, or None if there is no solution."""
+        return next(self.all_solutions(), None)
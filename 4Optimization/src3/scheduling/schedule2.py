@@ -0,0 +1,33 @@
+"""
+Backtracking search with AC-3, MRV/degree heuristics, least-constraining
+values and forward checking, using the in-project CSP solver.
+"""
+
+from csp import CSP
+
+VARIABLES = ["A", "B", "C", "D", "E", "F", "G"]
+CONSTRAINTS = [
+    ("A", "B"),
+    ("A", "C"),
+    ("B", "C"),
+    ("B", "D"),
+    ("B", "E"),
+    ("C", "E"),
+    ("C", "F"),
+    ("D", "E"),
+    ("E", "F"),
+    ("E", "G"),
+    ("F", "G")
+]
+
+problem = CSP()
+problem.add_variables(VARIABLES, ["Monday", "Tuesday", "Wednesday"])
+for x, y in CONSTRAINTS:
+    problem.add_constraint(x, y)
+
+# One valid solution
+print(problem.solve())
+
+# Every solution, as in schedule1.py
+for solution in problem.all_solutions():
+    print(solution)
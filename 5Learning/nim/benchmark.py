@@ -0,0 +1,44 @@
+import sys
+import time
+
+import nim
+import qtable
+
+from optimal import accuracy
+
+ALPHAS = [0.1, 0.3, 0.5, 0.9]
+EPSILONS = [0.05, 0.1, 0.3]
+
+
+def main():
+    if len(sys.argv) > 3:
+        sys.exit("Usage: python benchmark.py [games] [dict|array]")
+    games = int(sys.argv[1]) if len(sys.argv) >= 2 else 10000
+    trainer = sys.argv[2] if len(sys.argv) == 3 else "dict"
+
+    print(f"{'alpha':>6} {'epsilon':>8} {'games':>8} {'seconds':>8} {'optimal':>8}")
+    for alpha in ALPHAS:
+        for epsilon in EPSILONS:
+            seconds, score = benchmark(games, alpha, epsilon, trainer)
+            print(f"{alpha:>6} {epsilon:>8} {games:>8} {seconds:>8.2f} {score:>8.1%}")
+
+
+def benchmark(games, alpha, epsilon, trainer="dict", initial=[1, 3, 5, 7]):
+    """
+    Train an AI on `games` games with the given settings, using `NimAI`
+    ("dict") or `ArrayNimAI` ("array"). Return the training time in
+    seconds and the fraction of winning states where it plays optimally.
+    """
+    start = time.perf_counter()
+    if trainer == "dict":
+        ai = nim.train(games, alpha=alpha, epsilon=epsilon, log=False, initial=initial)
+    elif trainer == "array":
+        ai = qtable.train(games, initial=initial, alpha=alpha, epsilon=epsilon, log_every=0)
+    else:
+        raise ValueError(f"unknown trainer: {trainer}")
+    seconds = time.perf_counter() - start
+    return seconds, accuracy(ai, initial)
+
+
+if __name__ == "__main__":
+    main()
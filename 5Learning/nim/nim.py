@@ -171,17 +171,19 @@ class NimAI():
         return action
         
 
-def train(n):
+def train(n, alpha=0.5, epsilon=0.1, log=True, initial=[1, 3, 5, 7]):
     """
-    Train an AI by playing `n` games against itself.
+    Train an AI by playing `n` games against itself, starting from the
+    piles in `initial`.
     """
 
-    player = NimAI()
+    player = NimAI(alpha=alpha, epsilon=epsilon)
 
     # Play n games
     for i in range(n):
-        print(f"Playing training game {i + 1}")
-        game = Nim()
+        if log:
+            print(f"Playing training game {i + 1}")
+        game = Nim(initial)
 
         # Keep track of last move made by either player
         last = {
@@ -224,15 +226,16 @@ def train(n):
                     0
                 )
 
-    print("Done training")
+    if log:
+        print("Done training")
 
     # Return the trained AI
     return player
 
 
-def play(ai, human_player=None):
+def play(ai, human_player=None, initial=[1, 3, 5, 7]):
     """
-    Play human game against the AI.
+    Play human game against the AI, starting from the piles in `initial`.
     `human_player` can be set to 0 or 1 to specify whether
     human player moves first or second.
     """
@@ -242,7 +245,7 @@ def play(ai, human_player=None):
         human_player = random.randint(0, 1)
 
     # Create new game
-    game = Nim()
+    game = Nim(initial)
 
     # Game loop
     while True:
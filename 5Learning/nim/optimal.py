@@ -0,0 +1,70 @@
+import itertools
+
+from nim import Nim
+
+
+def winning(piles):
+    """
+    Return True if the player to move in `piles` can force a win.
+
+    In this game the player who takes the last object loses (misère Nim).
+    While some pile has more than one object, the player to move wins
+    exactly when the nim-sum (XOR of all piles) is nonzero. Once every
+    pile has at most one object, they win exactly when an even number of
+    piles remain.
+    """
+    if all(pile <= 1 for pile in piles):
+        return sum(piles) % 2 == 0
+    nim_sum = 0
+    for pile in piles:
+        nim_sum ^= pile
+    return nim_sum != 0
+
+
+def optimal_actions(piles):
+    """
+    Return the set of actions `(i, j)` that leave the opponent in a losing
+    position. The set is empty if `piles` is already lost.
+    """
+    actions = set()
+    for i, j in Nim.available_actions(piles):
+        result = list(piles)
+        result[i] -= j
+        if not winning(result):
+            actions.add((i, j))
+    return actions
+
+
+def states(initial=[1, 3, 5, 7]):
+    """Return every state reachable from `initial`, including the empty one."""
+    return [list(piles) for piles in itertools.product(*(range(pile + 1) for pile in initial))]
+
+
+class OptimalNimAI():
+
+    def choose_action(self, state, epsilon=False):
+        """
+        Return an optimal action `(i, j)` for `state`.
+        From a lost position, return any available action.
+        """
+        actions = optimal_actions(state)
+        if not actions:
+            actions = Nim.available_actions(state)
+        return min(actions)
+
+
+def accuracy(ai, initial=[1, 3, 5, 7]):
+    """
+    Return the fraction of winning states from which `ai`'s greedy action
+    is optimal. Losing states are left out, since every move there loses.
+    """
+    matches = 0
+    total = 0
+    for state in states(initial):
+        actions = optimal_actions(state)
+        if not actions:
+            continue
+        total += 1
+        if ai.choose_action(state, epsilon=False) in actions:
+            matches += 1
+    return matches / total if total else 1.0
@@ -0,0 +1,121 @@
+import os
+import sys
+import time
+
+from multiprocessing import Pool, shared_memory
+
+import numpy as np
+
+import qtable
+
+
+def main():
+    if len(sys.argv) not in [3, 4]:
+        sys.exit("Usage: python parallel.py games output.npz [average|shared]")
+    games = int(sys.argv[1])
+    output = sys.argv[2]
+    mode = sys.argv[3] if len(sys.argv) == 4 else "average"
+
+    ai = train(games, mode=mode, log=True)
+    ai.save(output)
+    print(f"Saved Q-table to {output}")
+
+
+def train(n, initial=[1, 3, 5, 7], alpha=0.5, epsilon=0.1, workers=None,
+          rounds=10, mode="average", seed=None, log=False):
+    """
+    Train an AI on `n` self-play games split across `workers` processes.
+
+    Training runs in `rounds`; in each round every worker plays its own
+    batch of games with its own random seed. In "average" mode every
+    worker starts the round from the same Q-table, and the changes they
+    make are averaged into it at the end of the round. In "shared" mode
+    the Q-table lives in shared memory and every worker updates it in
+    place without locking, as a parameter server would.
+    """
+    if mode not in ["average", "shared"]:
+        raise ValueError(f"unknown mode: {mode}")
+    workers = workers or os.cpu_count()
+    ai = qtable.ArrayNimAI(initial, alpha=alpha, epsilon=epsilon)
+    valid = ai.table.valid
+    seeds = np.random.SeedSequence(seed).spawn(workers * rounds)
+    start = time.perf_counter()
+    played = 0
+
+    shared = None
+    if mode == "shared":
+        shared = shared_memory.SharedMemory(create=True, size=ai.q.nbytes)
+        q = np.ndarray(ai.q.shape, dtype=ai.q.dtype, buffer=shared.buf)
+        q[...] = ai.q
+
+    try:
+        with Pool(workers) as pool:
+            for r in range(rounds):
+
+                # Split this round's games evenly across the workers
+                remaining = n - played
+                per_round = remaining // (rounds - r)
+                batches = [
+                    per_round // workers + (1 if w < per_round % workers else 0)
+                    for w in range(workers)
+                ]
+                tasks = [
+                    (initial, alpha, epsilon, games, seeds[r * workers + w])
+                    for w, games in enumerate(batches) if games
+                ]
+
+                if mode == "average":
+                    values = ai.q[valid]
+                    deltas = pool.starmap(
+                        play_average, [task + (values,) for task in tasks]
+                    )
+                    ai.q[valid] += np.mean(deltas, axis=0)
+                else:
+                    pool.starmap(
+                        play_shared, [task + (shared.name,) for task in tasks]
+                    )
+
+                played += per_round
+                if log:
+                    elapsed = time.perf_counter() - start
+                    print(f"Round {r + 1}: played {played} training games ({played / elapsed:.0f} games/s)")
+
+        if shared is not None:
+            ai.q[...] = q
+    finally:
+        if shared is not None:
+            del q
+            shared.close()
+            shared.unlink()
+
+    if log:
+        print(f"Done training in {time.perf_counter() - start:.2f}s")
+    return ai
+
+
+def play_average(initial, alpha, epsilon, games, seed, values):
+    """
+    Play `games` games starting from the Q-values `values` (the entries
+    of available actions), and return how much training changed them.
+    """
+    ai = qtable.ArrayNimAI(initial, alpha=alpha, epsilon=epsilon)
+    valid = ai.table.valid
+    ai.q[valid] = values
+    qtable.train(games, seed=seed, log_every=0, player=ai)
+    return ai.q[valid] - values
+
+
+def play_shared(initial, alpha, epsilon, games, seed, name):
+    """Play `games` games, updating the Q-table in shared memory `name` in place."""
+    ai = qtable.ArrayNimAI(initial, alpha=alpha, epsilon=epsilon)
+    shared = shared_memory.SharedMemory(name=name)
+    try:
+        ai.q = np.ndarray(ai.q.shape, dtype=ai.q.dtype, buffer=shared.buf)
+        qtable.train(games, seed=seed, log_every=0, player=ai)
+    finally:
+        del ai
+        shared.close()
+
+
+if __name__ == "__main__":
+    main()
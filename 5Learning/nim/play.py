@@ -1,4 +1,11 @@
+import sys
+
 from nim import train, play
 
-ai = train(10000)
-play(ai)
+# Load a Q-table saved by parallel.py, or train a new AI
+if len(sys.argv) == 2:
+    from qtable import ArrayNimAI
+    ai = ArrayNimAI.load(sys.argv[1])
+    play(ai, initial=ai.table.initial)
+else:
+    play(train(10000))
@@ -0,0 +1,255 @@
+import random
+import time
+
+import numpy as np
+
+from nim import Nim
+
+
+class NimTable():
+
+    def __init__(self, initial=[1, 3, 5, 7]):
+        """
+        Dense encoding of the states and actions of Nim from `initial`.
+
+        A state (a list of piles) is encoded as a mixed-radix integer, so
+        every reachable state has an index in range(self.states).
+        Every action `(i, j)` that is ever possible has an index in
+        range(self.actions), with `self.pile[a]` and `self.count[a]`
+        giving `i` and `j` for action index `a`.
+        """
+        self.initial = list(initial)
+        self.radix = np.cumprod([1] + [pile + 1 for pile in self.initial[:-1]])
+        self.states = int(np.prod([pile + 1 for pile in self.initial]))
+
+        self.action_list = [
+            (i, j)
+            for i, pile in enumerate(self.initial)
+            for j in range(1, pile + 1)
+        ]
+        self.action_index = {action: a for a, action in enumerate(self.action_list)}
+        self.actions = len(self.action_list)
+        self.pile = np.array([i for i, _ in self.action_list], dtype=np.intp)
+        self.count = np.array([j for _, j in self.action_list], dtype=np.int64)
+
+        # Piles for every state, and which actions are available in it
+        self.state_piles = (
+            np.arange(self.states)[:, None] // self.radix[None, :]
+        ) % (np.array(self.initial) + 1)[None, :]
+        self.valid = self.state_piles[:, self.pile] >= self.count[None, :]
+
+        # For each state, its available action indices first, then padding
+        self.available = self.valid.sum(axis=1)
+        self.available_actions = np.argsort(~self.valid, axis=1, kind="stable")
+
+    def encode(self, piles):
+        """Return the index of a state, or an array of indices for a 2D array of states."""
+        return np.asarray(piles) @ self.radix
+
+    def decode(self, index):
+        """Return the piles of the state with the given index."""
+        return [int(pile) for pile in self.state_piles[index]]
+
+
+class ArrayNimAI():
+
+    def __init__(self, initial=[1, 3, 5, 7], alpha=0.5, epsilon=0.1):
+        """
+        Initialize AI with an array-backed Q-table, an alpha (learning)
+        rate, and an epsilon rate.
+
+        `self.q[s, a]` is the Q-value of action index `a` in state index
+        `s` (see NimTable). Every available action starts at 0, like a
+        missing key in `NimAI`; unavailable actions are fixed at -inf so a
+        plain max or argmax over a row only sees available actions.
+        """
+        self.table = NimTable(initial)
+        self.q = np.zeros((self.table.states, self.table.actions))
+        self.q[~self.table.valid] = -np.inf
+        self.alpha = alpha
+        self.epsilon = epsilon
+
+    def save(self, filename):
+        """Save the Q-table and settings to a `.npz` file."""
+        np.savez(
+            filename,
+            q=self.q,
+            initial=np.array(self.table.initial),
+            alpha=self.alpha,
+            epsilon=self.epsilon
+        )
+
+    @classmethod
+    def load(cls, filename):
+        """Load an AI saved with `save`."""
+        with np.load(filename) as data:
+            ai = cls(
+                [int(pile) for pile in data["initial"]],
+                alpha=float(data["alpha"]),
+                epsilon=float(data["epsilon"])
+            )
+            ai.q[...] = data["q"]
+        return ai
+
+    def get_q_value(self, state, action):
+        """Return the Q-value for the state `state` and the action `action`."""
+        return self.q[self.table.encode(state), self.table.action_index[action]]
+
+    def best_future_reward(self, state):
+        """
+        Return the maximum Q-value over actions available in `state`,
+        or 0 if that is larger or there are no available actions.
+        """
+        return float(self.best_future_rewards(np.array([self.table.encode(state)]))[0])
+
+    def best_future_rewards(self, states):
+        """Vectorized `best_future_reward` over an array of state indices."""
+        return np.maximum(self.q[states].max(axis=1), 0)
+
+    def update(self, old_state, action, new_state, reward):
+        """
+        Update Q-learning model, given an old state, an action taken
+        in that state, a new resulting state, and the reward received
+        from taking that action.
+        """
+        self.updates(
+            np.array([self.table.encode(old_state)]),
+            np.array([self.table.action_index[action]]),
+            np.array([self.table.encode(new_state)]),
+            np.array([reward], dtype=float)
+        )
+
+    def updates(self, states, actions, new_states, rewards):
+        """
+        Apply many Q-learning updates at once.
+
+        When several updates hit the same (state, action) pair, the value
+        moves once towards the mean of their targets.
+        """
+        if len(states) == 0:
+            return
+        targets = rewards + self.best_future_rewards(new_states)
+        deltas = targets - self.q[states, actions]
+
+        # Average the deltas of each distinct (state, action) pair
+        pairs, inverse = np.unique(
+            states * self.table.actions + actions, return_inverse=True
+        )
+        total = np.bincount(inverse, weights=deltas)
+        hits = np.bincount(inverse)
+        self.q[pairs // self.table.actions, pairs % self.table.actions] += self.alpha * total / hits
+
+    def choose_action(self, state, epsilon=True):
+        """
+        Given a state `state`, return an action `(i, j)` to take,
+        either greedily or, if `epsilon` is True, epsilon-greedily.
+        """
+        index = self.table.encode(state)
+        if epsilon and random.random() < self.epsilon:
+            return random.choice(list(Nim.available_actions(state)))
+        return self.table.action_list[int(np.argmax(self.q[index]))]
+
+    def choose_actions(self, states, rng, epsilon=True):
+        """
+        Vectorized epsilon-greedy selection: return one action index for
+        each state index in `states`. Ties are broken at random.
+        """
+        values = self.q[states]
+        greedy = (values + rng.random(values.shape) * 1e-9).argmax(axis=1)
+        if not epsilon:
+            return greedy
+
+        # Random available action: the k-th one, with k uniform
+        explore = rng.random(len(states)) < self.epsilon
+        explored = states[explore]
+        k = (rng.random(len(explored)) * self.table.available[explored]).astype(np.intp)
+        greedy[explore] = self.table.available_actions[explored, k]
+        return greedy
+
+
+def train(n, initial=[1, 3, 5, 7], alpha=0.5, epsilon=0.1, batch=1024,
+          log_every=100000, seed=None, player=None):
+    """
+    Train an AI by playing `n` games against itself, `batch` games at a
+    time in lockstep. Finished games are immediately replaced by new ones.
+    If `player` is given, continue training it instead of a new AI.
+    """
+    if player is None:
+        player = ArrayNimAI(initial, alpha=alpha, epsilon=epsilon)
+    initial = player.table.initial
+    table = player.table
+    rng = np.random.default_rng(seed)
+    start = time.perf_counter()
+
+    batch = min(batch, n)
+    piles = np.tile(np.array(initial, dtype=np.int64), (batch, 1))
+    states = table.encode(piles)
+    started = batch
+    finished = 0
+    logged = 0
+    rows = np.arange(batch)
+
+    # Last state and action of each player in each game, -1 if none yet
+    player_to_move = np.zeros(batch, dtype=np.intp)
+    last_state = np.full((batch, 2), -1, dtype=np.intp)
+    last_action = np.full((batch, 2), -1, dtype=np.intp)
+    active = np.ones(batch, dtype=bool)
+
+    while finished < n:
+
+        # Every active game makes one move
+        moving = rows[active]
+        old_states = states[moving]
+        actions = player.choose_actions(old_states, rng)
+        piles[moving, table.pile[actions]] -= table.count[actions]
+        new_states = table.encode(piles[moving])
+        mover = player_to_move[moving]
+        other = 1 - mover
+        over = new_states == 0
+
+        # The mover took the last object and lost; the other player won
+        # Otherwise the other player's last move gets no reward yet
+        winner_state = last_state[moving, other]
+        winner_action = last_action[moving, other]
+        won = over & (winner_state >= 0)
+        waiting = ~over & (winner_state >= 0)
+        player.updates(
+            np.concatenate([old_states[over], winner_state[won], winner_state[waiting]]),
+            np.concatenate([actions[over], winner_action[won], winner_action[waiting]]),
+            np.concatenate([new_states[over], new_states[won], new_states[waiting]]),
+            np.concatenate([
+                np.full(over.sum(), -1.0),
+                np.full(won.sum(), 1.0),
+                np.zeros(waiting.sum())
+            ])
+        )
+
+        # Remember this move and pass the turn
+        last_state[moving, mover] = old_states
+        last_action[moving, mover] = actions
+        player_to_move[moving] = other
+        states[moving] = new_states
+
+        # Replace finished games with new ones, while any remain to be played
+        done = moving[over]
+        finished += len(done)
+        restart = done[:max(0, n - started)]
+        started += len(restart)
+        active[done] = False
+        active[restart] = True
+        piles[restart] = initial
+        states[restart] = table.encode(piles[restart])
+        player_to_move[restart] = 0
+        last_state[restart] = -1
+        last_action[restart] = -1
+
+        if log_every and finished - logged >= log_every:
+            logged = finished - finished % log_every
+            elapsed = time.perf_counter() - start
+            print(f"Played {finished} training games ({finished / elapsed:.0f} games/s)")
+
+    if log_every:
+        print(f"Done training in {time.perf_counter() - start:.2f}s")
+
+    # Return the trained AI
+    return player
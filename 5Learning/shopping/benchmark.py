@@ -0,0 +1,61 @@
+import sys
+import time
+
+import numpy as np
+
+import loader
+
+from neighbors import INDEXES, Standardizer
+
+QUERIES = 2000
+SIZES = [1000, 2000, 5000, 10000, 50000]
+
+
+def main():
+    if len(sys.argv) != 2:
+        sys.exit("Usage: python benchmark.py data")
+    evidence, labels = loader.load_data(sys.argv[1])
+    evidence = Standardizer().fit(evidence).transform(evidence)
+    labels = np.asarray(labels)
+
+    # Hold out a fixed set of queries
+    rng = np.random.default_rng(0)
+    order = rng.permutation(len(evidence))
+    queries, query_labels = evidence[order[:QUERIES]], labels[order[:QUERIES]]
+    pool, pool_labels = evidence[order[QUERIES:]], labels[order[QUERIES:]]
+
+    print(f"{'size':>7} {'index':>7} {'build s':>8} {'queries/s':>10} {'accuracy':>9} {'agreement':>10}")
+    for size in SIZES:
+        points, point_labels = sample(pool, pool_labels, size, rng)
+        baseline = None
+        for name, index_type in INDEXES.items():
+            start = time.perf_counter()
+            index = index_type(points)
+            built = time.perf_counter() - start
+
+            start = time.perf_counter()
+            nearest = index.query(queries)
+            elapsed = time.perf_counter() - start
+
+            if baseline is None:
+                baseline = nearest
+            accuracy = (point_labels[nearest] == query_labels).mean()
+            agreement = (nearest == baseline).mean()
+            print(f"{size:>7} {name:>7} {built:>8.3f} {len(queries) / elapsed:>10.0f} {accuracy:>9.1%} {agreement:>10.1%}")
+
+
+def sample(points, labels, size, rng):
+    """
+    Return `size` training points. Beyond the size of the data, points
+    are drawn with replacement and jittered so they stay distinct.
+    """
+    if size <= len(points):
+        chosen = rng.choice(len(points), size, replace=False)
+        return points[chosen], labels[chosen]
+    chosen = rng.choice(len(points), size, replace=True)
+    jitter = rng.normal(scale=0.01, size=(size, points.shape[1]))
+    return points[chosen] + jitter, labels[chosen]
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,118 @@
+import io
+import os
+
+import numpy as np
+
+MONTHS = ["Jan", "Feb", "Mar", "Apr", "May", "June",
+          "Jul", "Aug", "Sep", "Oct", "Nov", "Dec"]
+
+# Columns of the CSV, in the order they appear
+COLUMNS = [
+    "Administrative", "Administrative_Duration", "Informational",
+    "Informational_Duration", "ProductRelated", "ProductRelated_Duration",
+    "BounceRates", "ExitRates", "PageValues", "SpecialDay", "Month",
+    "OperatingSystems", "Browser", "Region", "TrafficType", "VisitorType",
+    "Weekend", "Revenue"
+]
+
+# Text substitutions that turn the categorical fields into numbers;
+# month names, visitor types and booleans only occur in their own columns
+REPLACEMENTS = (
+    [(f",{month},", f",{k},") for k, month in enumerate(MONTHS)]
+    + [(",Returning_Visitor,", ",1,"), (",New_Visitor,", ",0,"), (",Other,", ",0,")]
+    + [(",TRUE", ",1"), (",FALSE", ",0")]
+)
+
+CHUNK_ROWS = 100000
+
+
+def load_data(filename, cache=True, chunk_rows=CHUNK_ROWS):
+    """
+    Load shopping data from a CSV file `filename` into NumPy arrays.
+    Return a tuple (evidence, labels), where `evidence` is an (N, 17)
+    float64 matrix with the same columns and encodings as
+    `shopping.load_data`, and `labels` is an (N,) int64 vector.
+
+    Rows are parsed `chunk_rows` at a time into preallocated arrays.
+    Unless `cache` is False, the arrays are saved as `.npy` files next to
+    the CSV, keyed by its size and modification time. Later loads
+    memory-map those files instead of parsing again.
+    """
+    if cache:
+        evidence_path, labels_path = cache_paths(filename)
+        if os.path.exists(evidence_path) and os.path.exists(labels_path):
+            return (np.load(evidence_path, mmap_mode="r"),
+                    np.load(labels_path, mmap_mode="r"))
+
+    evidence, labels = parse(filename, chunk_rows)
+
+    if cache:
+        clear_cache(filename)
+        os.makedirs(os.path.dirname(evidence_path), exist_ok=True)
+        save(evidence_path, evidence)
+        save(labels_path, labels)
+    return evidence, labels
+
+
+def parse(filename, chunk_rows=CHUNK_ROWS):
+    """Parse the CSV into preallocated evidence and label arrays."""
+
+    # Count the data rows so the arrays can be allocated once
+    with open(filename, "rb") as f:
+        lines = sum(block.count(b"\n") for block in iter(lambda: f.read(1 << 20), b""))
+        f.seek(-1, os.SEEK_END)
+        if f.read(1) != b"\n":
+            lines += 1
+    rows = max(lines - 1, 0)
+
+    evidence = np.empty((rows, len(COLUMNS) - 1), dtype=np.float64)
+    labels = np.empty(rows, dtype=np.int64)
+
+    with open(filename) as f:
+        if f.readline().strip().split(",") != COLUMNS:
+            raise ValueError(f"unexpected columns in {filename}")
+
+        start = 0
+        while True:
+            chunk = "".join(line for _, line in zip(range(chunk_rows), f))
+            if not chunk.strip():
+                break
+
+            # Encode the categorical fields as numbers, then parse the whole chunk in C
+            for old, new in REPLACEMENTS:
+                chunk = chunk.replace(old, new)
+            table = np.loadtxt(io.StringIO(chunk), delimiter=",", dtype=np.float64, ndmin=2)
+            end = start + len(table)
+            evidence[start:end] = table[:, :-1]
+            labels[start:end] = table[:, -1]
+            start = end
+
+    return evidence[:start], labels[:start]
+
+
+def cache_paths(filename):
+    """Return the evidence and label cache paths for the current CSV contents."""
+    stat = os.stat(filename)
+    directory, name = os.path.split(os.path.abspath(filename))
+    stem = f"{name}-{stat.st_size}-{stat.st_mtime_ns}"
+    return (os.path.join(directory, ".cache", f"{stem}.evidence.npy"),
+            os.path.join(directory, ".cache", f"{stem}.labels.npy"))
+
+
+def save(path, array):
+    """Write `array` to `path`, so that readers never see a partial file."""
+    temporary = f"{path}.{os.getpid()}.tmp"
+    with open(temporary, "wb") as f:
+        np.save(f, array)
+    os.replace(temporary, path)
+
+
+def clear_cache(filename):
+    """Remove cached arrays left over from earlier versions of the CSV."""
+    directory, name = os.path.split(os.path.abspath(filename))
+    directory = os.path.join(directory, ".cache")
+    if not os.path.isdir(directory):
+        return
+    for entry in os.listdir(directory):
+        if entry.startswith(f"{name}-") and entry.endswith(".npy"):
+            os.remove(os.path.join(directory, entry))
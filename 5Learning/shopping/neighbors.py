@@ -0,0 +1,359 @@
+import json
+
+import numpy as np
+
+BATCH_SIZE = 1024
+
+
+class Standardizer():
+
+    def fit(self, X):
+        """Learn the mean and standard deviation of every feature."""
+        X = np.asarray(X, dtype=np.float64)
+        self.mean = X.mean(axis=0)
+        self.std = X.std(axis=0)
+        self.std[self.std == 0] = 1
+        return self
+
+    def transform(self, X):
+        """Scale features to zero mean and unit variance."""
+        return (np.asarray(X, dtype=np.float64) - self.mean) / self.std
+
+
+def squared_distances(queries, points, point_norms=None):
+    """
+    Return the matrix of squared Euclidean distances between every query
+    and every point, using |q|^2 - 2 q.p + |p|^2.
+    """
+    if point_norms is None:
+        point_norms = (points ** 2).sum(axis=1)
+    distances = (queries ** 2).sum(axis=1)[:, None] - 2 * queries @ points.T + point_norms[None, :]
+    return np.maximum(distances, 0)
+
+
+class BruteForceIndex():
+
+    def __init__(self, points, batch_size=BATCH_SIZE):
+        """Exact search by comparing each query with every point."""
+        self.points = np.asarray(points, dtype=np.float64)
+        self.norms = (self.points ** 2).sum(axis=1)
+        self.batch_size = batch_size
+
+    def query(self, queries):
+        """Return the index of the nearest point to every query."""
+        queries = np.asarray(queries, dtype=np.float64)
+        nearest = np.empty(len(queries), dtype=np.intp)
+        for start in range(0, len(queries), self.batch_size):
+            batch = queries[start:start + self.batch_size]
+            nearest[start:start + len(batch)] = squared_distances(
+                batch, self.points, self.norms
+            ).argmin(axis=1)
+        return nearest
+
+
+class KDTree():
+
+    def __init__(self, points, leaf_size=128):
+        """
+        Exact search with a k-d tree.
+
+        Nodes are stored in flat arrays: each node splits on `dims[n]` at
+        `splits[n]` into `left[n]` and `right[n]`, or, if it is a leaf
+        (`left[n] == -1`), owns points `order[starts[n]:ends[n]]`.
+        """
+        self.points = np.asarray(points, dtype=np.float64)
+        self.order = np.arange(len(self.points))
+        self.dims, self.splits, self.left, self.right = [], [], [], []
+        self.starts, self.ends = [], []
+
+        # Build the tree without recursion, splitting on the widest dimension at the median
+        self.new_node(0, len(self.points))
+        stack = [0]
+        while stack:
+            node = stack.pop()
+            start, end = self.starts[node], self.ends[node]
+            if end - start <= leaf_size:
+                continue
+            members = self.order[start:end]
+            spread = np.ptp(self.points[members], axis=0)
+            dim = int(spread.argmax())
+            if spread[dim] == 0:
+                continue
+            middle = (end - start) // 2
+            part = np.argpartition(self.points[members, dim], middle)
+            self.order[start:end] = members[part]
+            self.dims[node] = dim
+            self.splits[node] = self.points[self.order[start + middle], dim]
+            self.left[node] = self.new_node(start, start + middle)
+            self.right[node] = self.new_node(start + middle, end)
+            stack.extend([self.left[node], self.right[node]])
+
+        self.leaf_points = {
+            node: self.points[self.order[self.starts[node]:self.ends[node]]]
+            for node in range(len(self.left)) if self.left[node] == -1
+        }
+
+    def new_node(self, start, end):
+        """Append a leaf owning order[start:end] and return its index."""
+        self.dims.append(-1)
+        self.splits.append(0.0)
+        self.left.append(-1)
+        self.right.append(-1)
+        self.starts.append(start)
+        self.ends.append(end)
+        return len(self.left) - 1
+
+    def query(self, queries):
+        """Return the index of the nearest point to every query."""
+        queries = np.asarray(queries, dtype=np.float64)
+        nearest = np.empty(len(queries), dtype=np.intp)
+        for start in range(0, len(queries), self.batch_size):
+            batch = queries[start:start + self.batch_size]
+            nearest[start:start + len(batch)] = squared_distances(
+                batch, self.points, self.norms
+            ).argmin(axis=1)
+        return nearest
+
+
+class KDTree():
+
+    def __init__(self, points, leaf_size=128):
+        """
+        Exact search with a k-d tree.
+
+        Nodes are stored in flat arrays: each node splits on `dims[n]` at
+        `splits[n]` into `left[n]` and `right[n]`, or, if it is a leaf
+        (`left[n] == -1`), owns points `order[starts[n]:ends[n]]`.
+        """
+        self.points = np.asarray(points, dtype=np.float64)
+        self.order = np.arange(len(self.points))
+        self.dims, self.splits, self.left, self.right = [], [], [], []
+        self.starts, self.ends = [], []
+
+        # Build the tree without recursion, splitting on the widest dimension at the median
+        self.new_node(0, len(self.points))
+        stack = [0]
+        while stack:
+            node = stack.pop()
+            start, end = self.starts[node], self.ends[node]
+            if end - start <= leaf_size:
+                continue
+            members = self.order[start:end]
+            spread = np.ptp(self.points[members], axis=0)
+            dim = int(spread.argmax())
+            if spread[dim] == 0:
+                continue
+            middle = (end - start) // 2
+            part = np.argpartition(self.points[members, dim], middle)
+            self.order[start:end] = members[part]
+            self.dims[node] = dim
+            self.splits[node] = self.points[self.order[start + middle], dim]
+            self.left[node] = self.new_node(start, start + middle)
+            self.right[node] = self.new_node(start + middle, end)
+            stack.extend([self.left[node], self.right[node]])
+
+        self.leaf_points = {
+            node: self.points[self.order[self.starts[node]:self.ends[node]]]
+            for node in range(len(self.left)) if self.left[node] == -1
+        }
+
+    def new_node(self, start, end):
+        """Append a leaf owning order[start:end] and return its index."""
+        self.dims.append(-1)
+        self.splits.append(0.0)
+        self.left.append(-1)
+        self.right.append(-1)
+        self.starts.append(start)
+        self.ends.append(end)
+        return len(self.left) - 1
+
+    def query_one(self, query):
+        """Return the index of the point nearest to a single query."""
+        best_distance = np.inf
+        best = -1
+
+        # Stack of (node, lower bound on squared distance to anything in it)
+        stack = [(0, 0.0)]
+        while stack:
+            node, bound = stack.pop()
+            if bound >= best_distance:
+                continue
+            if self.left[node] == -1:
+                distances = ((self.leaf_points[node] - query) ** 2).sum(axis=1)
+                k = int(distances.argmin())
+                if distances[k] < best_distance:
+                    best_distance = distances[k]
+                    best = self.order[self.starts[node] + k]
+                continue
+
+            # Visit the side containing the query first
+            gap = query[self.dims[node]] - self.splits[node]
+            near, far = (self.left[node], self.right[node]) if gap < 0 else (self.right[node], self.left[node])
+            stack.append((far, max(bound, gap * gap)))
+            stack.append((near, bound))
+        return best
+
+    def query(self, queries):
+        """
+        Return the index of the nearest point to every query.
+
+        All queries walk the tree together: each node is visited once
+        with the array of queries that may still find something closer
+        there, so leaf distances are computed for many queries at a time.
+        """
+        queries = np.asarray(queries, dtype=np.float64)
+        best_distance = np.full(len(queries), np.inf)
+        nearest = np.full(len(queries), -1, dtype=np.intp)
+
+        # Stack of (node, query indices, their lower bounds for the node)
+        stack = [(0, np.arange(len(queries)), np.zeros(len(queries)))]
+        while stack:
+            node, asking, bounds = stack.pop()
+            keep = bounds < best_distance[asking]
+            asking, bounds = asking[keep], bounds[keep]
+            if len(asking) == 0:
+                continue
+
+            if self.left[node] == -1:
+                distances = squared_distances(queries[asking], self.leaf_points[node])
+                k = distances.argmin(axis=1)
+                found = distances[np.arange(len(asking)), k]
+                better = found < best_distance[asking]
+                best_distance[asking[better]] = found[better]
+                nearest[asking[better]] = self.order[self.starts[node] + k[better]]
+                continue
+
+            # Queries left of the split search left first, the others right first;
+            # the far side is pushed underneath so it is searched with a tighter bound
+            gaps = queries[asking, self.dims[node]] - self.splits[node]
+            far_bounds = np.maximum(bounds, gaps * gaps)
+            on_left = gaps < 0
+            left, right = self.left[node], self.right[node]
+            stack.append((right, asking[on_left], far_bounds[on_left]))
+            stack.append((left, asking[~on_left], far_bounds[~on_left]))
+            stack.append((left, asking[on_left], bounds[on_left]))
+            stack.append((right, asking[~on_left], bounds[~on_left]))
+        return nearest
+
+
+class IVFIndex():
+
+    def __init__(self, points, lists=None, probes=4, iterations=10, seed=0,
+                 batch_size=BATCH_SIZE):
+        """
+        Approximate search with an inverted file index: points are grouped
+        around `lists` k-means centroids, and each query only searches the
+        points of its `probes` nearest centroids.
+        """
+        self.points = np.asarray(points, dtype=np.float64)
+        self.norms = (self.points ** 2).sum(axis=1)
+        self.batch_size = batch_size
+        self.probes = probes
+        lists = lists or max(1, int(np.sqrt(len(self.points))))
+
+        # Lloyd's algorithm, starting from random points
+        rng = np.random.default_rng(seed)
+        self.centroids = self.points[rng.choice(len(self.points), lists, replace=False)]
+        for _ in range(iterations):
+            assignment = self.nearest_centroids(self.points, 1)[:, 0]
+            counts = np.bincount(assignment, minlength=lists)
+            sums = np.zeros_like(self.centroids)
+            np.add.at(sums, assignment, self.points)
+            filled = counts > 0
+            self.centroids[filled] = sums[filled] / counts[filled, None]
+
+        assignment = self.nearest_centroids(self.points, 1)[:, 0]
+        self.members = [np.flatnonzero(assignment == c) for c in range(lists)]
+
+    def nearest_centroids(self, queries, count):
+        """Return the indices of the `count` nearest centroids of every query."""
+        count = min(count, len(self.centroids))
+        result = np.empty((len(queries), count), dtype=np.intp)
+        for start in range(0, len(queries), self.batch_size):
+            distances = squared_distances(queries[start:start + self.batch_size], self.centroids)
+            result[start:start + len(distances)] = np.argpartition(distances, count - 1, axis=1)[:, :count]
+        return result
+
+    def query(self, queries):
+        """Return the index of the (approximately) nearest point to every query."""
+        queries = np.asarray(queries, dtype=np.float64)
+        probes = self.nearest_centroids(queries, self.probes)
+        best_distance = np.full(len(queries), np.inf)
+        nearest = np.zeros(len(queries), dtype=np.intp)
+
+        # Search one list at a time, against every query that probes it
+        for c, members in enumerate(self.members):
+            asking = np.flatnonzero((probes == c).any(axis=1))
+            if len(asking) == 0 or len(members) == 0:
+                continue
+            distances = squared_distances(queries[asking], self.points[members], self.norms[members])
+            k = distances.argmin(axis=1)
+            found = distances[np.arange(len(asking)), k]
+            better = found < best_distance[asking]
+            best_distance[asking[better]] = found[better]
+            nearest[asking[better]] = members[k[better]]
+        return nearest
+
+
+INDEXES = {
+    "brute": BruteForceIndex,
+    "kdtree": KDTree,
+    "ivf": IVFIndex
+}
+
+
+class NearestNeighborClassifier():
+
+    def __init__(self, index="kdtree", standardize=True, **options):
+        """
+        A 1-nearest-neighbor classifier with the fit/predict interface of
+        scikit-learn's KNeighborsClassifier(n_neighbors=1).
+        `index` is one of INDEXES; `options` are passed on to it.
+        """
+        if index not in INDEXES:
+            raise ValueError(f"unknown index: {index}")
+        self.index_name = index
+        self.index_type = INDEXES[index]
+        self.standardize = standardize
+        self.options = options
+
+    def fit(self, X, y):
+        """Index the training evidence `X` with labels `y`."""
+        self.evidence = np.asarray(X, dtype=np.float64)
+        self.labels = np.asarray(y)
+        self.scaler = Standardizer().fit(self.evidence) if self.standardize else None
+        if self.scaler is not None:
+            X = self.scaler.transform(self.evidence)
+        else:
+            X = self.evidence
+        self.index = self.index_type(X, **self.options)
+        return self
+
+    def save(self, filename):
+        """Save the training data and settings to a `.npz` file; the index is rebuilt on load."""
+        np.savez(
+            filename,
+            evidence=self.evidence,
+            labels=self.labels,
+            index=self.index_name,
+            standardize=self.standardize,
+            options=json.dumps(self.options)
+        )
+
+    @classmethod
+    def load(cls, filename):
+        """Load and re-index a classifier saved with `save`."""
+        with np.load(filename) as data:
+            model = cls(
+                index=str(data["index"]),
+                standardize=bool(data["standardize"]),
+                **json.loads(str(data["options"]))
+            )
+            return model.fit(data["evidence"], data["labels"])
+
+    def predict(self, X):
+        """Return the label of the nearest training example to every row of `X`."""
+        X = np.asarray(X, dtype=np.float64)
+        if self.scaler is not None:
+            X = self.scaler.transform(X)
+        return self.labels[self.index.query(X)]
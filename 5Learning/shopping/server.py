@@ -0,0 +1,230 @@
+import asyncio
+import json
+import math
+import sys
+import time
+
+from collections import deque
+
+import numpy as np
+
+import loader
+
+from neighbors import NearestNeighborClassifier
+
+MAX_BATCH = 512       # most sessions scored by one call to predict
+MAX_DELAY = 0.002     # seconds to wait for more requests to join a batch
+MAX_BODY = 1 << 20    # largest request body accepted, in bytes
+
+
+def main():
+    if len(sys.argv) == 4 and sys.argv[1] == "train":
+        evidence, labels = loader.load_data(sys.argv[2])
+        model = NearestNeighborClassifier(index="kdtree").fit(evidence, labels)
+        model.save(sys.argv[3])
+        print(f"Saved model trained on {len(labels)} sessions to {sys.argv[3]}")
+    elif len(sys.argv) in [3, 4] and sys.argv[1] == "serve":
+        port = int(sys.argv[3]) if len(sys.argv) == 4 else 8000
+        asyncio.run(serve(NearestNeighborClassifier.load(sys.argv[2]), port=port))
+    else:
+        sys.exit("Usage: python server.py train data model.npz\n"
+                 "       python server.py serve model.npz [port]")
+
+
+def encode(session):
+    """
+    Convert a session into a row of evidence, encoded as in
+    `shopping.load_data`. A session is either a list of the 17 numbers
+    already encoded, or an object keyed by the CSV column names, with
+    the values as they appear in the CSV (e.g. "Feb", "Returning_Visitor").
+    """
+    if isinstance(session, list):
+        if len(session) != len(loader.COLUMNS) - 1:
+            raise ValueError("a session list must have 17 values")
+        return [number(value) for value in session]
+
+    row = []
+    for column in loader.COLUMNS[:-1]:
+        value = session[column]
+        if column == "Month":
+            row.append(float(loader.MONTHS.index(value)))
+        elif column == "VisitorType":
+            row.append(1.0 if value == "Returning_Visitor" else 0.0)
+        elif column == "Weekend":
+            row.append(1.0 if value in [True, "TRUE"] else 0.0)
+        else:
+            row.append(number(value))
+    return row
+
+
+def number(value):
+    """Convert `value` to a float, rejecting NaN and infinities."""
+    x = float(value)
+    if not math.isfinite(x):
+        raise ValueError(f"{value!r} is not a finite number")
+    return x
+
+
+class Batcher():
+
+    def __init__(self, model, max_batch=MAX_BATCH, max_delay=MAX_DELAY):
+        """
+        Collect sessions from concurrent requests and score them with a
+        single vectorized `predict` call per batch.
+        """
+        self.model = model
+        self.max_batch = max_batch
+        self.max_delay = max_delay
+        self.queue = asyncio.Queue()
+        self.stats = {
+            "requests": 0,
+            "sessions": 0,
+            "batches": 0,
+            "errors": 0,
+            "started": time.time()
+        }
+        self.latencies = deque(maxlen=10000)
+
+    async def predict(self, rows):
+        """Queue rows for scoring and wait for their predictions."""
+        future = asyncio.get_running_loop().create_future()
+        await self.queue.put((rows, future))
+        return await future
+
+    async def run(self):
+        """Form batches from the queue and score them, forever."""
+        loop = asyncio.get_running_loop()
+        while True:
+            pending = [await self.queue.get()]
+            size = len(pending[0][0])
+
+            # Let other requests join until the batch is full or the delay passes
+            deadline = loop.time() + self.max_delay
+            while size < self.max_batch:
+                timeout = deadline - loop.time()
+                if timeout <= 0:
+                    break
+                try:
+                    item = await asyncio.wait_for(self.queue.get(), timeout)
+                except asyncio.TimeoutError:
+                    break
+                pending.append(item)
+                size += len(item[0])
+
+            rows = np.array([row for item, _ in pending for row in item], dtype=np.float64)
+            try:
+                predictions = await loop.run_in_executor(None, self.model.predict, rows)
+            except Exception as e:
+                for _, future in pending:
+                    if not future.done():
+                        future.set_exception(e)
+                continue
+
+            self.stats["batches"] += 1
+            # Requests cancelled while waiting (e.g. the client disconnected) are skipped
+            start = 0
+            for item, future in pending:
+                if not future.done():
+                    future.set_result(predictions[start:start + len(item)].tolist())
+                start += len(item)
+
+    def report(self):
+        """Return the counters, with latency percentiles in milliseconds."""
+        stats = dict(self.stats)
+        elapsed = time.time() - stats.pop("started")
+        stats["sessions_per_second"] = stats["sessions"] / elapsed if elapsed else 0
+        stats["mean_batch_size"] = stats["sessions"] / stats["batches"] if stats["batches"] else 0
+        if self.latencies:
+            latencies = np.array(self.latencies) * 1000
+            for p in [50, 90, 99]:
+                stats[f"latency_p{p}_ms"] = float(np.percentile(latencies, p))
+        return stats
+
+
+async def serve(model, host="127.0.0.1", port=8000):
+    """Serve predictions over HTTP until interrupted."""
+    batcher = Batcher(model)
+    worker = asyncio.create_task(batcher.run())
+    server = await asyncio.start_server(
+        lambda reader, writer: handle(batcher, reader, writer), host, port
+    )
+    print(f"Serving on http://{host}:{port} (POST /predict, GET /stats)")
+    try:
+        async with server:
+            await server.serve_forever()
+    finally:
+        worker.cancel()
+
+
+async def handle(batcher, reader, writer):
+    """Answer HTTP/1.1 requests on one connection, keeping it open between requests."""
+    try:
+        while True:
+            request = await reader.readline()
+            if not request:
+                break
+            method, path, _ = request.decode("latin-1").split(" ", 2)
+            headers = dict()
+            while True:
+                line = await reader.readline()
+                if line in [b"\r\n", b"\n", b""]:
+                    break
+                name, _, value = line.decode("latin-1").partition(":")
+                headers[name.strip().lower()] = value.strip()
+            length = int(headers.get("content-length", 0))
+            if length > MAX_BODY:
+                await respond(writer, 413, {"error": "request body too large"})
+                break
+            body = await reader.readexactly(length) if length else b""
+
+            status, result = await route(batcher, method, path, body)
+            await respond(writer, status, result)
+            if headers.get("connection", "").lower() == "close":
+                break
+    except (ConnectionError, asyncio.IncompleteReadError, ValueError):
+        pass
+    finally:
+        writer.close()
+
+
+async def route(batcher, method, path, body):
+    """Return the status code and JSON result for a request."""
+    if method == "GET" and path == "/stats":
+        return 200, batcher.report()
+    if method != "POST" or path != "/predict":
+        return 404, {"error": "not found"}
+
+    start = time.perf_counter()
+    batcher.stats["requests"] += 1
+    try:
+        sessions = json.loads(body)["sessions"]
+        rows = [encode(session) for session in sessions]
+    except (ValueError, KeyError, TypeError) as e:
+        batcher.stats["errors"] += 1
+        return 400, {"error": f"invalid sessions: {e}"}
+
+    try:
+        predictions = await batcher.predict(rows) if rows else []
+    except Exception as e:
+        batcher.stats["errors"] += 1
+        return 500, {"error": f"prediction failed: {e}"}
+    batcher.stats["sessions"] += len(rows)
+    batcher.latencies.append(time.perf_counter() - start)
+    return 200, {"predictions": predictions}
+
+
+async def respond(writer, status, result):
+    """Write a JSON response."""
+    body = json.dumps(result).encode()
+    reason = {200: "OK", 400: "Bad Request", 404: "Not Found", 413: "Payload Too Large",
+              500: "Internal Server Error"}[status]
+    writer.write(
+        f"HTTP/1.1 {status} {reason}\r\n"
+        f"Content-Type: application/json\r\n"
+        f"Content-Length: {len(body)}\r\n\r\n".encode() + body
+    )
+    await writer.drain()
+
+
+if __name__ == "__main__":
+    main()
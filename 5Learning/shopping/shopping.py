@@ -2,6 +2,8 @@ import csv
 import sys
 from numpy import positive
 
+import loader
+
 from sklearn.model_selection import train_test_split
 from sklearn.neighbors import KNeighborsClassifier
 
@@ -14,8 +16,8 @@ def main():
     if len(sys.argv) != 2:
         sys.exit("Usage: python shopping.py data")
 
-    # Load data from spreadsheet and split into train and test sets
-    evidence, labels = load_data(sys.argv[1])
+    # Load data from spreadsheet (cached as typed arrays) and split into train and test sets
+    evidence, labels = loader.load_data(sys.argv[1])
     X_train, X_test, y_train, y_test = train_test_split(
         evidence, labels, test_size=TEST_SIZE
     )
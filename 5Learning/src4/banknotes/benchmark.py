@@ -0,0 +1,150 @@
+import csv
+import json
+import os
+import subprocess
+import sys
+import time
+
+import numpy as np
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+KERAS_BANKNOTES = os.path.join(HERE, "..", "..", "..", "6NeuralNetworks", "src5", "banknotes")
+TEST_SIZE = 0.4
+
+
+def main():
+
+    # Each candidate runs in a child process, so its imports are timed from scratch
+    if len(sys.argv) == 3 and sys.argv[1] == "run":
+        print(json.dumps(run(sys.argv[2])))
+        return
+    if len(sys.argv) not in [1, 2]:
+        sys.exit("Usage: python benchmark.py [repeats]")
+    repeats = int(sys.argv[1]) if len(sys.argv) == 2 else 3
+
+    print(f"{'model':>20} {'total s':>8} {'import s':>9} {'fit s':>7} {'predict s':>10} {'accuracy':>9}")
+    for name in CANDIDATES:
+        results = []
+        for _ in range(repeats):
+            start = time.perf_counter()
+            output = subprocess.run(
+                [sys.executable, __file__, "run", name],
+                capture_output=True, text=True, check=True, cwd=HERE
+            ).stdout
+            result = json.loads(output.strip().splitlines()[-1])
+            result["total"] = time.perf_counter() - start
+            results.append(result)
+
+        # Report medians across repeats
+        median = {
+            key: float(np.median([result[key] for result in results]))
+            for key in ["total", "import", "fit", "predict", "accuracy"]
+        }
+        print(
+            f"{name:>20} {median['total']:>8.2f} {median['import']:>9.2f} "
+            f"{median['fit']:>7.3f} {median['predict']:>10.4f} {median['accuracy']:>9.1%}"
+        )
+
+
+def run(name):
+    """
+    Import, train and test one candidate, returning the seconds spent on
+    each step and the accuracy on a fixed holdout set.
+    """
+    X_training, X_testing, y_training, y_testing = load_data("banknotes.csv")
+
+    start = time.perf_counter()
+    model = CANDIDATES[name]()
+    imported = time.perf_counter()
+    model.fit(X_training, y_training)
+    fitted = time.perf_counter()
+    predictions = model.predict(X_testing)
+    predicted = time.perf_counter()
+
+    return {
+        "import": imported - start,
+        "fit": fitted - imported,
+        "predict": predicted - fitted,
+        "accuracy": float((np.asarray(predictions) == y_testing).mean())
+    }
+
+
+def load_data(filename, seed=0):
+    """Read the banknotes CSV and split it the same way for every candidate."""
+    with open(filename) as f:
+        reader = csv.reader(f)
+        next(reader)
+        rows = [[float(cell) for cell in row] for row in reader]
+    data = np.array(rows)
+    evidence, labels = data[:, :4], data[:, 4].astype(int)
+
+    order = np.random.default_rng(seed).permutation(len(data))
+    holdout = int(TEST_SIZE * len(data))
+    testing, training = order[:holdout], order[holdout:]
+    return evidence[training], evidence[testing], labels[training], labels[testing]
+
+
+def numpy_perceptron():
+    from classifiers import Perceptron
+    return Perceptron(seed=0)
+
+
+def numpy_logistic():
+    from classifiers import LogisticRegression
+    return LogisticRegression(seed=0)
+
+
+def numpy_mlp():
+    from classifiers import MLPClassifier
+    return MLPClassifier(seed=0)
+
+
+def sklearn_perceptron():
+    from sklearn.linear_model import Perceptron
+    return Perceptron()
+
+
+def sklearn_logistic():
+    from sklearn.linear_model import LogisticRegression
+    return LogisticRegression()
+
+
+def sklearn_mlp():
+    from sklearn.neural_network import MLPClassifier
+    return MLPClassifier(hidden_layer_sizes=(8,), max_iter=20, random_state=0)
+
+
+def tensorflow_mlp():
+    sys.path.insert(0, KERAS_BANKNOTES)
+    import banknotes
+    return KerasClassifier(banknotes.get_model(), banknotes.EPOCHS)
+
+
+class KerasClassifier():
+
+    def __init__(self, model, epochs):
+        """Give a compiled Keras model with one sigmoid output fit/predict methods."""
+        self.model = model
+        self.epochs = epochs
+
+    def fit(self, X, y):
+        self.model.fit(X, y, epochs=self.epochs, verbose=0)
+        return self
+
+    def predict(self, X):
+        return (self.model.predict(X, verbose=0)[:, 0] > 0.5).astype(int)
+
+
+CANDIDATES = {
+    "numpy perceptron": numpy_perceptron,
+    "numpy logistic": numpy_logistic,
+    "numpy mlp": numpy_mlp,
+    "sklearn perceptron": sklearn_perceptron,
+    "sklearn logistic": sklearn_logistic,
+    "sklearn mlp": sklearn_mlp,
+    "tensorflow mlp": tensorflow_mlp
+}
+
+
+if __name__ == "__main__":
+    main()
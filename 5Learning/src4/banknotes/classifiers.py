@@ -0,0 +1,197 @@
+import numpy as np
+
+
+class SGD():
+
+    def __init__(self, learning_rate=0.01):
+        """Plain stochastic gradient descent."""
+        self.learning_rate = learning_rate
+
+    def step(self, params, grads):
+        """Move every parameter against its gradient, in place."""
+        for param, grad in zip(params, grads):
+            param -= self.learning_rate * grad
+
+
+class Adam():
+
+    def __init__(self, learning_rate=0.001, beta1=0.9, beta2=0.999, epsilon=1e-8):
+        """Adam, with the defaults used by Keras."""
+        self.learning_rate = learning_rate
+        self.beta1 = beta1
+        self.beta2 = beta2
+        self.epsilon = epsilon
+        self.moments = None
+
+    def step(self, params, grads):
+        """Update every parameter with bias-corrected moment estimates, in place."""
+        if self.moments is None:
+            self.moments = [(np.zeros_like(param), np.zeros_like(param)) for param in params]
+            self.t = 0
+        self.t += 1
+        correction1 = 1 - self.beta1 ** self.t
+        correction2 = 1 - self.beta2 ** self.t
+        for param, grad, (m, v) in zip(params, grads, self.moments):
+            m *= self.beta1
+            m += (1 - self.beta1) * grad
+            v *= self.beta2
+            v += (1 - self.beta2) * grad ** 2
+            param -= self.learning_rate * (m / correction1) / (np.sqrt(v / correction2) + self.epsilon)
+
+
+OPTIMIZERS = {
+    "sgd": SGD,
+    "adam": Adam
+}
+
+
+class Classifier():
+
+    def __init__(self, epochs, batch_size, learning_rate, optimizer, seed=None):
+        """
+        Base class for models trained by mini-batch gradient descent.
+        Subclasses set up `self.params` in `initialize`, and compute
+        gradients and scores in `gradients` and `scores`.
+        """
+        self.epochs = epochs
+        self.batch_size = batch_size
+        self.learning_rate = learning_rate
+        self.optimizer = optimizer
+        self.seed = seed
+
+    def fit(self, X, y):
+        """Train on evidence `X` and labels `y`, which may be any values."""
+        X = np.asarray(X, dtype=np.float64)
+        self.classes_, targets = np.unique(np.asarray(y), return_inverse=True)
+        rng = np.random.default_rng(self.seed)
+        self.initialize(X.shape[1], len(self.classes_), rng)
+        optimizer = OPTIMIZERS[self.optimizer](self.learning_rate)
+
+        for _ in range(self.epochs):
+            order = rng.permutation(len(X))
+            for start in range(0, len(X), self.batch_size):
+                batch = order[start:start + self.batch_size]
+                optimizer.step(self.params, self.gradients(X[batch], targets[batch]))
+        return self
+
+    def predict(self, X):
+        """Return the predicted label for every row of `X`."""
+        scores = self.scores(np.asarray(X, dtype=np.float64))
+        if scores.ndim == 1:
+            return self.classes_[(scores > 0).astype(np.intp)]
+        return self.classes_[scores.argmax(axis=1)]
+
+
+class Perceptron(Classifier):
+
+    def __init__(self, epochs=5, batch_size=1, learning_rate=1.0, optimizer="sgd", seed=None):
+        """
+        A perceptron for two classes. With a batch size of 1, this is the
+        classic rule of nudging the weights towards each misclassified example.
+        """
+        super().__init__(epochs, batch_size, learning_rate, optimizer, seed)
+
+    def initialize(self, features, classes, rng):
+        if classes != 2:
+            raise ValueError("Perceptron needs exactly two classes")
+        self.weights = np.zeros(features)
+        self.bias = np.zeros(1)
+        self.params = [self.weights, self.bias]
+
+    def scores(self, X):
+        return X @ self.weights + self.bias[0]
+
+    def gradients(self, X, targets):
+        error = (self.scores(X) > 0) - targets
+        return [X.T @ error / len(X), np.array([error.mean()])]
+
+
+class LogisticRegression(Classifier):
+
+    def __init__(self, epochs=100, batch_size=32, learning_rate=0.01, optimizer="adam",
+                 alpha=0.0001, seed=None):
+        """Logistic regression for two classes with an L2 penalty of `alpha`."""
+        super().__init__(epochs, batch_size, learning_rate, optimizer, seed)
+        self.alpha = alpha
+
+    def initialize(self, features, classes, rng):
+        if classes != 2:
+            raise ValueError("LogisticRegression needs exactly two classes")
+        self.weights = np.zeros(features)
+        self.bias = np.zeros(1)
+        self.params = [self.weights, self.bias]
+
+    def scores(self, X):
+        return X @ self.weights + self.bias[0]
+
+    def predict_proba(self, X):
+        """Return the probability of each class for every row of `X`."""
+        p = sigmoid(self.scores(np.asarray(X, dtype=np.float64)))
+        return np.stack([1 - p, p], axis=1)
+
+    def gradients(self, X, targets):
+        error = sigmoid(self.scores(X)) - targets
+        return [X.T @ error / len(X) + self.alpha * self.weights, np.array([error.mean()])]
+
+
+class MLPClassifier(Classifier):
+
+    def __init__(self, hidden=(8,), epochs=20, batch_size=32, learning_rate=0.001,
+                 optimizer="adam", seed=None):
+        """
+        A neural network with ReLU hidden layers of the sizes in `hidden`
+        and a softmax output, trained on cross-entropy. The defaults match
+        the Keras model in banknotes.py.
+        """
+        super().__init__(epochs, batch_size, learning_rate, optimizer, seed)
+        self.hidden = hidden
+
+    def initialize(self, features, classes, rng):
+
+        # Glorot uniform weights and zero biases, as in Keras
+        sizes = [features, *self.hidden, classes]
+        self.params = []
+        for inputs, outputs in zip(sizes, sizes[1:]):
+            limit = np.sqrt(6 / (inputs + outputs))
+            self.params.append(rng.uniform(-limit, limit, (inputs, outputs)))
+            self.params.append(np.zeros(outputs))
+
+    def forward(self, X):
+        """Return the activations of every layer, starting with `X`."""
+        activations = [X]
+        for i in range(0, len(self.params), 2):
+            z = activations[-1] @ self.params[i] + self.params[i + 1]
+            activations.append(np.maximum(z, 0) if i + 2 < len(self.params) else z)
+        return activations
+
+    def scores(self, X):
+        return self.forward(X)[-1]
+
+    def predict_proba(self, X):
+        """Return the probability of each class for every row of `X`."""
+        return softmax(self.scores(np.asarray(X, dtype=np.float64)))
+
+    def gradients(self, X, targets):
+        activations = self.forward(X)
+
+        # Softmax with cross-entropy has gradient (p - onehot) at the output
+        delta = softmax(activations[-1])
+        delta[np.arange(len(X)), targets] -= 1
+        delta /= len(X)
+
+        grads = [None] * len(self.params)
+        for i in range(len(self.params) - 2, -1, -2):
+            grads[i] = activations[i // 2].T @ delta
+            grads[i + 1] = delta.sum(axis=0)
+            if i:
+                delta = (delta @ self.params[i].T) * (activations[i // 2] > 0)
+        return grads
+
+
+def sigmoid(z):
+    return 0.5 * (1 + np.tanh(0.5 * z))
+
+
+def softmax(z):
+    e = np.exp(z - z.max(axis=1, keepdims=True))
+    return e / e.sum(axis=1, keepdims=True)
@@ -0,0 +1,120 @@
+import os
+import statistics
+import sys
+import time
+
+from multiprocessing import Pool, shared_memory
+
+import numpy as np
+
+from sklearn import svm
+from sklearn.linear_model import Perceptron
+from sklearn.naive_bayes import GaussianNB
+from sklearn.neighbors import KNeighborsClassifier
+
+import classifiers
+
+MODELS = {
+    "Perceptron": lambda: Perceptron(),
+    "SVC": lambda: svm.SVC(),
+    "KNeighborsClassifier": lambda: KNeighborsClassifier(n_neighbors=1),
+    "GaussianNB": lambda: GaussianNB(),
+    "NumPy LogisticRegression": lambda: classifiers.LogisticRegression(seed=0),
+    "NumPy MLPClassifier": lambda: classifiers.MLPClassifier(hidden=(16, 16), epochs=50, seed=0)
+}
+
+# The data set in shared memory, attached once in each worker process
+data = None
+memory = None
+
+
+def main():
+    if len(sys.argv) not in [1, 2, 3]:
+        sys.exit("Usage: python crossval.py [folds] [workers]")
+    folds = int(sys.argv[1]) if len(sys.argv) >= 2 else 10
+    workers = int(sys.argv[2]) if len(sys.argv) == 3 else None
+
+    results = cross_validate("banknotes.csv", folds=folds, workers=workers)
+
+    print(f"{folds}-fold cross-validation")
+    print(f"{'model':>25} {'accuracy':>9} {'stdev':>7} {'fit ms':>8} {'predict ms':>11}")
+    for name, scores in sorted(results.items(), key=lambda item: -item[1]["accuracy"]):
+        print(
+            f"{name:>25} {scores['accuracy']:>9.2%} {scores['stdev']:>7.2%} "
+            f"{scores['fit'] * 1000:>8.2f} {scores['predict'] * 1000:>11.2f}"
+        )
+
+
+def cross_validate(filename, names=None, folds=10, workers=None, seed=0):
+    """
+    Evaluate every model in MODELS, or just those in `names`, over
+    `folds` folds of the data in `filename`, running each (model, fold)
+    pair as a separate task across `workers` processes.
+
+    The CSV is parsed once into shared memory, which every worker maps
+    instead of receiving its own copy. Returns, for every model, the mean
+    and standard deviation of its accuracy and its mean fit and predict
+    times in seconds.
+    """
+    table = np.loadtxt(filename, delimiter=",", skiprows=1)
+    names = list(MODELS) if names is None else names
+    shared = shared_memory.SharedMemory(create=True, size=table.nbytes)
+    array = np.ndarray(table.shape, dtype=table.dtype, buffer=shared.buf)
+    try:
+        array[...] = table
+
+        tasks = [(name, fold, folds, seed) for name in names for fold in range(folds)]
+        with Pool(workers or os.cpu_count(), initializer=attach,
+                  initargs=(shared.name, table.shape, table.dtype)) as pool:
+            outcomes = pool.starmap(evaluate, tasks)
+    finally:
+        del array
+        shared.close()
+        shared.unlink()
+
+    results = {}
+    for name in names:
+        accuracies, fits, predicts = zip(*[
+            (accuracy, fit, predict)
+            for model, accuracy, fit, predict in outcomes if model == name
+        ])
+        results[name] = {
+            "accuracy": statistics.mean(accuracies),
+            "stdev": statistics.stdev(accuracies) if folds > 1 else 0.0,
+            "fit": statistics.mean(fits),
+            "predict": statistics.mean(predicts)
+        }
+    return results
+
+
+def attach(name, shape, dtype):
+    """Map the shared data set into this worker process."""
+    global data, memory
+    memory = shared_memory.SharedMemory(name=name)
+    data = np.ndarray(shape, dtype=dtype, buffer=memory.buf)
+
+
+def evaluate(name, fold, folds, seed):
+    """
+    Train model `name` on every fold but `fold` and test it on that one.
+    Returns the model name, its accuracy and the seconds spent fitting
+    and predicting.
+    """
+    order = np.random.default_rng(seed).permutation(len(data))
+    testing = np.array_split(order, folds)[fold]
+    training = np.setdiff1d(order, testing, assume_unique=True)
+    evidence, labels = data[:, :4], data[:, 4].astype(int)
+
+    model = MODELS[name]()
+    start = time.perf_counter()
+    model.fit(evidence[training], labels[training])
+    fitted = time.perf_counter()
+    predictions = model.predict(evidence[testing])
+    predicted = time.perf_counter()
+
+    accuracy = float((predictions == labels[testing]).mean())
+    return name, accuracy, fitted - start, predicted - fitted
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,225 @@
+import argparse
+import importlib
+import itertools
+import json
+import multiprocessing
+import numpy as np
+import os
+import resource
+import sys
+import tensorflow as tf
+import time
+
+from concurrent.futures import ProcessPoolExecutor
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+PRECISIONS = ["float32", "mixed_float16", "mixed_bfloat16"]
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Benchmark training of the neural network projects on this machine."
+    )
+    parser.add_argument("model", choices=sorted(MODELS))
+    parser.add_argument("data", nargs="?", help="data directory or CSV file, if the model needs one")
+    parser.add_argument("--batch-size", default="32", help="comma-separated batch sizes to try")
+    parser.add_argument("--threads", default="0", help="comma-separated thread counts to try, 0 for TensorFlow's default")
+    parser.add_argument("--precision", default="float32", help=f"comma-separated policies from {', '.join(PRECISIONS)}")
+    parser.add_argument("--epochs", type=int, help="number of epochs, defaults to the project's own")
+    parser.add_argument("--output", help="write the JSON report to this file instead of stdout")
+    args = parser.parse_args()
+
+    precisions = args.precision.split(",")
+    for precision in precisions:
+        if precision not in PRECISIONS:
+            parser.error(f"unknown precision {precision}")
+    configurations = itertools.product(
+        [int(size) for size in args.batch_size.split(",")],
+        [int(threads) for threads in args.threads.split(",")],
+        precisions
+    )
+
+    # Every configuration trains in a fresh process, since TensorFlow's
+    # thread pools and precision policy can't change once it has started
+    runs = []
+    context = multiprocessing.get_context("spawn")
+    for batch_size, threads, precision in configurations:
+        print(
+            f"Training {args.model}: batch size {batch_size}, "
+            f"{threads or 'default'} threads, {precision}",
+            file=sys.stderr
+        )
+        with ProcessPoolExecutor(1, mp_context=context) as executor:
+            run = executor.submit(
+                benchmark, args.model, args.data, batch_size, threads, precision, args.epochs
+            ).result()
+        print(f"  {run['samples_per_second']:.0f} samples/sec", file=sys.stderr)
+        runs.append(run)
+
+    report = {
+        "model": args.model,
+        "cpus": os.cpu_count(),
+        "runs": runs,
+        "best": max(runs, key=lambda run: run["samples_per_second"])["configuration"]
+    }
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+        print(f"Report saved to {args.output}.", file=sys.stderr)
+    else:
+        print(json.dumps(report, indent=2))
+
+
+def benchmark(name, data, batch_size, threads=0, precision="float32", epochs=None):
+    """
+    Train the project `name` once and return a report of how fast it
+    trained and how much memory it used.
+    """
+    started = time.perf_counter()
+    if threads:
+        tf.config.threading.set_intra_op_parallelism_threads(threads)
+        tf.config.threading.set_inter_op_parallelism_threads(threads)
+    tf.keras.mixed_precision.set_global_policy(precision)
+
+    x_train, y_train, x_test, y_test, get_model, default_epochs = MODELS[name](data)
+    model = get_model()
+    prepared = time.perf_counter()
+
+    monitor = TrainingMonitor(len(x_train))
+    model.fit(
+        x_train, y_train, batch_size=batch_size, epochs=epochs or default_epochs,
+        callbacks=[monitor], verbose=0
+    )
+    loss, accuracy = model.evaluate(x_test, y_test, batch_size=batch_size, verbose=0)
+
+    # The first epoch includes tracing and graph building, so leave it out
+    steady = monitor.epochs[1:] or monitor.epochs
+    return {
+        "configuration": {
+            "batch_size": batch_size,
+            "threads": threads,
+            "precision": precision
+        },
+        "startup_seconds": prepared - started,
+        "samples_per_second": float(np.mean([epoch["samples_per_second"] for epoch in steady])),
+        "peak_rss_mib": peak_rss(),
+        "test_loss": loss,
+        "test_accuracy": accuracy,
+        "epochs": monitor.epochs
+    }
+
+
+class TrainingMonitor(tf.keras.callbacks.Callback):
+
+    def __init__(self, samples):
+        """
+        Record per-epoch throughput, step latencies and memory use for
+        training on `samples` examples.
+        """
+        super().__init__()
+        self.samples = samples
+        self.epochs = []
+
+    def on_epoch_begin(self, epoch, logs=None):
+        self.epoch_started = self.step_ended = time.perf_counter()
+        self.steps = []
+        self.waiting = 0
+
+    def on_train_batch_begin(self, batch, logs=None):
+
+        # Time between steps is spent fetching the next batch of data
+        self.step_started = time.perf_counter()
+        self.waiting += self.step_started - self.step_ended
+
+    def on_train_batch_end(self, batch, logs=None):
+        self.step_ended = time.perf_counter()
+        self.steps.append(self.step_ended - self.step_started)
+
+    def on_epoch_end(self, epoch, logs=None):
+        seconds = time.perf_counter() - self.epoch_started
+        steps = np.array(self.steps) * 1000
+        self.epochs.append({
+            "epoch": epoch + 1,
+            "seconds": seconds,
+            "samples_per_second": self.samples / seconds,
+            "step_ms": {
+                "mean": float(steps.mean()),
+                "p50": float(np.percentile(steps, 50)),
+                "p90": float(np.percentile(steps, 90)),
+                "p99": float(np.percentile(steps, 99)),
+                "max": float(steps.max())
+            },
+            "compute_seconds": float(steps.sum() / 1000),
+            "data_seconds": self.waiting,
+            "peak_rss_mib": peak_rss(),
+            **{name: float(value) for name, value in (logs or {}).items()}
+        })
+
+
+def peak_rss():
+    """Return the peak resident memory of this process in MiB."""
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+    # Linux reports kilobytes, macOS bytes
+    return peak / (1024 * 1024 if sys.platform == "darwin" else 1024)
+
+
+def project(directory, module):
+    """Import `module` from the project in `directory`."""
+    path = os.path.join(ROOT, directory)
+    if path not in sys.path:
+        sys.path.insert(0, path)
+    return importlib.import_module(module)
+
+
+def split(x, y, test_size, seed=0):
+    """Shuffle arrays `x` and `y` together and split off a test set."""
+    order = np.random.default_rng(seed).permutation(len(x))
+    boundary = int(round(len(x) * (1 - test_size)))
+    train, test = order[:boundary], order[boundary:]
+    return x[train], y[train], x[test], y[test]
+
+
+def handwriting(data):
+    """Prepare MNIST for `handwriting.py`; `data` is unused."""
+    handwriting = project("src5/digits", "handwriting")
+    (x_train, y_train), (x_test, y_test) = handwriting.load_data()
+    return x_train, y_train, x_test, y_test, handwriting.get_model, handwriting.EPOCHS
+
+
+def traffic(data):
+    """Prepare the images in directory `data` for `traffic.py`."""
+    if data is None:
+        raise ValueError("traffic needs a data directory")
+    traffic = project("traffic", "traffic")
+    images, labels = traffic.loader.load_data(
+        data, width=traffic.IMG_WIDTH, height=traffic.IMG_HEIGHT
+    )
+    labels = tf.keras.utils.to_categorical(labels, traffic.NUM_CATEGORIES)
+    return (
+        *split(np.asarray(images), labels, traffic.TEST_SIZE),
+        traffic.get_model, traffic.EPOCHS
+    )
+
+
+def banknotes(data):
+    """Prepare the CSV file `data` for `banknotes.py`."""
+    banknotes = project("src5/banknotes", "banknotes")
+    evidence, labels = banknotes.load_data(
+        data or os.path.join(ROOT, "src5/banknotes/banknotes.csv")
+    )
+    return (
+        *split(np.array(evidence, dtype=np.float32), np.array(labels), 0.4),
+        banknotes.get_model, banknotes.EPOCHS
+    )
+
+
+MODELS = {
+    "handwriting": handwriting,
+    "traffic": traffic,
+    "banknotes": banknotes
+}
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,102 @@
+import numpy as np
+import os
+import random
+import sys
+import tensorflow as tf
+
+from fractions import Fraction
+
+from predict import decode, list_images
+
+MODES = ["float32", "float16", "int8"]
+CALIBRATION_SIZE = 200
+
+
+def main():
+
+    # Check command-line arguments
+    if len(sys.argv) not in [3, 4, 5, 6]:
+        sys.exit(
+            "Usage: python export.py model.h5 model.tflite "
+            "[float32|float16|int8] [scale] [calibration_directory]"
+        )
+    mode = sys.argv[3] if len(sys.argv) >= 4 else "int8"
+    if mode not in MODES:
+        sys.exit(f"Unknown mode {mode}, expected one of {', '.join(MODES)}")
+    scale = float(Fraction(sys.argv[4])) if len(sys.argv) >= 5 else 1.0
+    calibration = sys.argv[5] if len(sys.argv) == 6 else None
+
+    model = tf.keras.models.load_model(sys.argv[1])
+    content = export(model, mode=mode, scale=scale, calibration=calibration)
+    with open(sys.argv[2], "wb") as f:
+        f.write(content)
+    print(
+        f"Model saved to {sys.argv[2]} "
+        f"({os.path.getsize(sys.argv[1]) / 1024:.0f} KiB -> {len(content) / 1024:.0f} KiB)."
+    )
+
+
+def export(model, mode="int8", scale=1.0, calibration=None):
+    """
+    Convert a trained Keras image model to a TFLite flatbuffer and return
+    its bytes.
+
+    The exported model takes raw pixel values: inputs are multiplied by
+    `scale` first, so a model trained on pixels divided by 255 (like
+    `handwriting.py`) should be exported with a scale of 1/255.
+
+    `mode` "float16" halves the weights. "int8" quantizes the weights, and
+    if `calibration` names a directory of sample images, the activations
+    too, so that every operation runs in integer arithmetic.
+    """
+    frozen = freeze(model, scale)
+    converter = tf.lite.TFLiteConverter.from_keras_model(frozen)
+
+    if mode == "float16":
+        converter.optimizations = [tf.lite.Optimize.DEFAULT]
+        converter.target_spec.supported_types = [tf.float16]
+    elif mode == "int8":
+        converter.optimizations = [tf.lite.Optimize.DEFAULT]
+        if calibration is not None:
+            converter.representative_dataset = representative_dataset(
+                calibration, frozen.input_shape[1:]
+            )
+            converter.target_spec.supported_ops = [tf.lite.OpsSet.TFLITE_BUILTINS_INT8]
+
+    return converter.convert()
+
+
+def freeze(model, scale=1.0):
+    """
+    Return an inference-only copy of `model` that scales its inputs
+    by `scale`. Dropout and other training-only layers become no-ops.
+    """
+    inputs = tf.keras.Input(shape=model.input_shape[1:], batch_size=None)
+    outputs = inputs
+    if scale != 1.0:
+        outputs = tf.keras.layers.Rescaling(scale)(outputs)
+    outputs = model(outputs, training=False)
+    return tf.keras.Model(inputs, outputs)
+
+
+def representative_dataset(directory, shape, size=CALIBRATION_SIZE):
+    """
+    Return a generator function yielding up to `size` random images from
+    `directory`, which the converter uses to choose activation ranges.
+    """
+    height, width, channels = shape
+    paths = list_images(directory)
+    if not paths:
+        raise ValueError(f"no images found in {directory}")
+    paths = random.Random(0).sample(paths, min(size, len(paths)))
+
+    def generate():
+        for path in paths:
+            image = decode(path, height, width, channels)
+            yield [image[np.newaxis].astype(np.float32)]
+
+    return generate
+
+
+if __name__ == "__main__":
+    main()
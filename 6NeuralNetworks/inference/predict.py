@@ -0,0 +1,151 @@
+import cv2
+import numpy as np
+import os
+import sys
+import time
+
+from concurrent.futures import ThreadPoolExecutor
+
+# Prefer a standalone TFLite runtime, which starts far faster than TensorFlow
+try:
+    from ai_edge_litert.interpreter import Interpreter
+except ImportError:
+    try:
+        from tflite_runtime.interpreter import Interpreter
+    except ImportError:
+        import tensorflow as tf
+        Interpreter = tf.lite.Interpreter
+
+BATCH_SIZE = 64
+EXTENSIONS = {".bmp", ".jpeg", ".jpg", ".png", ".ppm"}
+
+
+def main():
+
+    # Check command-line arguments
+    if len(sys.argv) not in [3, 4, 5]:
+        sys.exit("Usage: python predict.py model.tflite directory [batch_size] [threads]")
+    batch_size = int(sys.argv[3]) if len(sys.argv) >= 4 else BATCH_SIZE
+    threads = int(sys.argv[4]) if len(sys.argv) == 5 else os.cpu_count()
+
+    started = time.perf_counter()
+    predictor = Predictor(sys.argv[1], batch_size=batch_size, threads=threads)
+    paths = list_images(sys.argv[2])
+    if not paths:
+        sys.exit(f"No images found in {sys.argv[2]}")
+
+    # Classify every image, printing the most likely category for each
+    classified = time.perf_counter()
+    for path, category, confidence in predictor.classify(paths):
+        print(f"{path}\t{category}\t{confidence:.3f}")
+    finished = time.perf_counter()
+
+    print(
+        f"{len(paths)} images in {finished - classified:.2f}s "
+        f"({len(paths) / (finished - classified):.1f} images/sec, "
+        f"{classified - started:.2f}s to load the model)",
+        file=sys.stderr
+    )
+
+
+class Predictor():
+
+    def __init__(self, filename, batch_size=BATCH_SIZE, threads=None):
+        """
+        Load a TFLite model written by `export.py` for batches of
+        `batch_size` images, using `threads` threads for both decoding
+        and inference.
+        """
+        self.batch_size = batch_size
+        self.threads = threads or os.cpu_count()
+        self.interpreter = Interpreter(model_path=filename, num_threads=self.threads)
+
+        # Resize the input once so every full batch runs in a single invoke
+        self.input = self.interpreter.get_input_details()[0]
+        self.output = self.interpreter.get_output_details()[0]
+        _, self.height, self.width, self.channels = self.input["shape"]
+        self.interpreter.resize_tensor_input(
+            self.input["index"], (batch_size, self.height, self.width, self.channels)
+        )
+        self.interpreter.allocate_tensors()
+
+    def predict(self, images):
+        """
+        Return the model's output for an array of at most `batch_size`
+        images, given as raw pixel values.
+        """
+        count = len(images)
+        if count < self.batch_size:
+            padding = np.zeros((self.batch_size - count,) + images.shape[1:], images.dtype)
+            images = np.concatenate([images, padding])
+        self.interpreter.set_tensor(self.input["index"], self.quantize(images))
+        self.interpreter.invoke()
+        return self.dequantize(self.interpreter.get_tensor(self.output["index"]))[:count]
+
+    def classify(self, paths):
+        """
+        Yield (path, category, confidence) for each image file in `paths`.
+        The next batch is decoded while the current one is classified.
+        """
+        batches = [
+            paths[i:i + self.batch_size]
+            for i in range(0, len(paths), self.batch_size)
+        ]
+        with ThreadPoolExecutor(self.threads) as executor:
+            pending = [executor.submit(self.decode, path) for path in batches[0]] if batches else []
+            for i, batch in enumerate(batches):
+                images = np.stack([future.result() for future in pending])
+                if i + 1 < len(batches):
+                    pending = [executor.submit(self.decode, path) for path in batches[i + 1]]
+                output = self.predict(images)
+                for path, row in zip(batch, output):
+                    category = int(row.argmax())
+                    yield path, category, float(row[category])
+
+    def decode(self, path):
+        """Decode one image file to match the model's input shape."""
+        return decode(path, self.height, self.width, self.channels)
+
+    def quantize(self, images):
+        """Convert pixel values to the model's input type."""
+        dtype = self.input["dtype"]
+        scale, zero_point = self.input["quantization"]
+        if np.issubdtype(dtype, np.integer) and scale:
+            images = np.round(images / scale + zero_point)
+            info = np.iinfo(dtype)
+            return np.clip(images, info.min, info.max).astype(dtype)
+        return images.astype(dtype)
+
+    def dequantize(self, output):
+        """Convert the model's output back to floats."""
+        scale, zero_point = self.output["quantization"]
+        if np.issubdtype(output.dtype, np.integer) and scale:
+            return (output.astype(np.float32) - zero_point) * scale
+        return output
+
+
+def decode(path, height, width, channels):
+    """
+    Read an image file as a height x width x channels array of pixels.
+    Color images keep OpenCV's BGR order, as in `traffic.py`.
+    """
+    flags = cv2.IMREAD_GRAYSCALE if channels == 1 else cv2.IMREAD_COLOR
+    image = cv2.imread(path, flags)
+    if image is None:
+        raise ValueError(f"could not read image {path}")
+    image = cv2.resize(image, dsize=(width, height))
+    return image.reshape(height, width, channels)
+
+
+def list_images(directory):
+    """Return the paths of all image files below `directory`, sorted."""
+    paths = []
+    for root, _, files in os.walk(directory):
+        for name in files:
+            if os.path.splitext(name)[1].lower() in EXTENSIONS:
+                paths.append(os.path.join(root, name))
+    return sorted(paths)
+
+
+if __name__ == "__main__":
+    main()
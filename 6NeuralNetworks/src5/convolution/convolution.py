@@ -0,0 +1,205 @@
+import numpy as np
+import os
+import sys
+
+from concurrent.futures import ProcessPoolExecutor
+from PIL import Image
+
+# Kernels larger than this many weights are applied with the FFT
+FFT_THRESHOLD = 121
+
+KERNELS = {
+    "edge": np.array([
+        [-1, -1, -1],
+        [-1, 8, -1],
+        [-1, -1, -1]
+    ]),
+    "sharpen": np.array([
+        [0, -1, 0],
+        [-1, 5, -1],
+        [0, -1, 0]
+    ]),
+    "sobel_x": np.array([
+        [-1, 0, 1],
+        [-2, 0, 2],
+        [-1, 0, 1]
+    ]),
+    "sobel_y": np.array([
+        [-1, -2, -1],
+        [0, 0, 0],
+        [1, 2, 1]
+    ]),
+    "blur": np.full((5, 5), 1 / 25),
+    "box": np.full((31, 31), 1 / 961)
+}
+
+
+def main():
+
+    # Ensure correct usage
+    if len(sys.argv) not in [3, 4]:
+        sys.exit(f"Usage: python convolution.py directory output_directory [{'|'.join(KERNELS)}]")
+    kernel = sys.argv[3] if len(sys.argv) == 4 else "edge"
+    if kernel not in KERNELS:
+        sys.exit(f"Unknown kernel {kernel}")
+
+    # Filter every image in the directory in parallel
+    count = filter_directory(sys.argv[1], sys.argv[2], KERNELS[kernel])
+    print(f"Filtered {count} images into {sys.argv[2]}.")
+
+
+def convolve(images, kernels, stride=1, padding=0, mode="constant", method="auto", tile=None):
+    """
+    Apply a bank of kernels to a batch of images, as in a convolutional
+    layer (that is, cross-correlation: kernels are not flipped).
+
+    `images` has shape (N, H, W, C). `kernels` has shape (K, kh, kw, C),
+    with each kernel summing over every channel, and the result has shape
+    (N, H', W', K).
+
+    `padding` is a number of pixels for every side, a (rows, columns)
+    pair, "valid" for none or "same" to keep H' = ceil(H / stride).
+    Padded pixels are filled by `np.pad` using `mode`.
+
+    `method` is "im2col", "fft" or "auto", which uses the FFT for kernels
+    with more than FFT_THRESHOLD weights. If `tile` is given, at most that
+    many output rows are computed at once, which bounds the memory used by
+    im2col on large images.
+    """
+    images = np.asarray(images, dtype=np.float64)
+    kernels = np.asarray(kernels, dtype=np.float64)
+    if images.ndim != 4 or kernels.ndim != 4 or images.shape[3] != kernels.shape[3]:
+        raise ValueError(
+            f"cannot convolve images {images.shape} with kernels {kernels.shape}"
+        )
+    _, kh, kw, _ = kernels.shape
+    if isinstance(stride, int):
+        stride = (stride, stride)
+
+    # Pad the images, then convolve with no padding
+    top, bottom, left, right = padding_for(images.shape[1:3], (kh, kw), stride, padding)
+    if top or bottom or left or right:
+        images = np.pad(images, ((0, 0), (top, bottom), (left, right), (0, 0)), mode=mode)
+    height = (images.shape[1] - kh) // stride[0] + 1
+    width = (images.shape[2] - kw) // stride[1] + 1
+    if height < 1 or width < 1:
+        raise ValueError(f"kernels {kernels.shape} are larger than images {images.shape}")
+
+    if method == "auto":
+        method = "fft" if kh * kw > FFT_THRESHOLD else "im2col"
+    if method == "im2col":
+        function = im2col_convolve
+    elif method == "fft":
+        function = fft_convolve
+    else:
+        raise ValueError(f"unknown method {method}")
+
+    if tile is None or tile >= height:
+        return function(images, kernels, stride)
+
+    # Convolve one band of output rows at a time
+    output = np.empty((images.shape[0], height, width, kernels.shape[0]))
+    for row in range(0, height, tile):
+        rows = min(tile, height - row)
+        start = row * stride[0]
+        end = start + (rows - 1) * stride[0] + kh
+        output[:, row:row + rows] = function(images[:, start:end], kernels, stride)
+    return output
+
+
+def im2col_convolve(images, kernels, stride):
+    """
+    Convolve padded `images` with `kernels` by gathering every image patch
+    into a matrix and multiplying it by the flattened kernels.
+    """
+    _, kh, kw, _ = kernels.shape
+
+    # A strided view of every patch, shape (N, H', W', C, kh, kw)
+    patches = np.lib.stride_tricks.sliding_window_view(images, (kh, kw), axis=(1, 2))
+    patches = patches[:, ::stride[0], ::stride[1]]
+
+    # tensordot copies the patches into one matrix for a single BLAS call
+    return np.tensordot(patches, kernels, axes=([3, 4, 5], [3, 1, 2]))
+
+
+def fft_convolve(images, kernels, stride):
+    """
+    Convolve padded `images` with `kernels` by multiplying their Fourier
+    transforms, which costs the same for any kernel size.
+    """
+    _, height, width, _ = images.shape
+    _, kh, kw, _ = kernels.shape
+
+    # Correlation is convolution with the kernel flipped. The valid part of
+    # a circular convolution the size of the image has no wrap-around.
+    shape = (height, width)
+    transformed = np.fft.rfft2(images, s=shape, axes=(1, 2))
+    flipped = np.fft.rfft2(kernels[:, ::-1, ::-1], s=shape, axes=(1, 2))
+    product = np.einsum("nhwc,khwc->nhwk", transformed, flipped)
+    output = np.fft.irfft2(product, s=shape, axes=(1, 2))
+    return output[:, kh - 1::stride[0], kw - 1::stride[1]]
+
+
+def padding_for(size, kernel, stride, padding):
+    """Return (top, bottom, left, right) padding for an image of `size`."""
+    if padding == "valid":
+        return 0, 0, 0, 0
+    if padding == "same":
+        sides = []
+        for length, k, s in zip(size, kernel, stride):
+            total = max((-(-length // s) - 1) * s + k - length, 0)
+            sides.extend([total // 2, total - total // 2])
+        return tuple(sides)
+    if isinstance(padding, int):
+        return padding, padding, padding, padding
+    rows, columns = padding
+    return rows, rows, columns, columns
+
+
+def filter_image(image, kernel, stride=1, padding="same", mode="edge", method="auto", tile=None):
+    """
+    Apply a single 2D `kernel` to each channel of an image array
+    (H, W) or (H, W, C), as PIL's ImageFilter.Kernel does, and return
+    the result clipped to 0-255 as uint8.
+    """
+    image = np.asarray(image)
+    channels = image.reshape(image.shape[0], image.shape[1], -1)
+
+    # Filter each channel as a separate single-channel image
+    batch = channels.transpose(2, 0, 1)[..., np.newaxis]
+    kernels = np.asarray(kernel)[np.newaxis, :, :, np.newaxis]
+    output = convolve(
+        batch, kernels, stride=stride, padding=padding, mode=mode, method=method, tile=tile
+    )
+    output = output[..., 0].transpose(1, 2, 0)
+
+    output = np.clip(np.rint(output), 0, 255).astype(np.uint8)
+    return output.reshape(output.shape[:2] + image.shape[2:])
+
+
+def filter_directory(directory, output_directory, kernel, workers=None):
+    """
+    Filter every image file in `directory` with `kernel` across a pool of
+    processes, saving the results under the same names in
+    `output_directory`. Return the number of images filtered.
+    """
+    os.makedirs(output_directory, exist_ok=True)
+    jobs = []
+    for name in sorted(os.listdir(directory)):
+        path = os.path.join(directory, name)
+        if os.path.isfile(path) and Image.registered_extensions().get(os.path.splitext(name)[1].lower()):
+            jobs.append((path, os.path.join(output_directory, name), kernel))
+
+    with ProcessPoolExecutor(workers) as executor:
+        return sum(executor.map(filter_file, *zip(*jobs))) if jobs else 0
+
+
+def filter_file(path, destination, kernel):
+    """Filter the image at `path` and save it to `destination`."""
+    image = np.asarray(Image.open(path).convert("RGB"))
+    Image.fromarray(filter_image(image, kernel)).save(destination)
+    return 1
+
+
+if __name__ == "__main__":
+    main()
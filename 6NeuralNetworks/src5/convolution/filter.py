@@ -1,7 +1,9 @@
-import math
+import numpy as np
 import sys
 
-from PIL import Image, ImageFilter
+from PIL import Image
+
+from convolution import filter_image
 
 # Ensure correct usage
 if len(sys.argv) != 2:
@@ -11,11 +13,11 @@ if len(sys.argv) != 2:
 image = Image.open(sys.argv[1]).convert("RGB")
 
 # Filter image according to edge detection kernel
-filtered = image.filter(ImageFilter.Kernel(
-    size=(3, 3),
-    kernel=[-1, -1, -1, -1, 8, -1, -1, -1, -1],
-    scale=1
-))
+filtered = Image.fromarray(filter_image(np.asarray(image), [
+    [-1, -1, -1],
+    [-1, 8, -1],
+    [-1, -1, -1]
+]))
 
 # Show resulting image
 filtered.show()
@@ -1,13 +1,15 @@
 import numpy as np
 import pygame
+import queue
 import sys
 import tensorflow as tf
+import threading
 import time
 
 # Check command-line arguments
-if len(sys.argv) != 2:
-    sys.exit("Usage: python recognition.py model")
-model = tf.keras.models.load_model(sys.argv[1])
+if len(sys.argv) not in [2, 3] or sys.argv[2:] not in [[], ["continuous"]]:
+    sys.exit("Usage: python recognition.py model [continuous]")
+continuous = len(sys.argv) == 3
 
 # Colors
 BLACK = (0, 0, 0)
@@ -17,6 +19,8 @@ WHITE = (255, 255, 255)
 pygame.init()
 size = width, height = 600, 400
 screen = pygame.display.set_mode(size)
+clock = pygame.time.Clock()
+FPS = 60
 
 # Fonts
 OPEN_SANS = "assets/fonts/OpenSans-Regular.ttf"
@@ -28,9 +32,110 @@ ROWS, COLS = 28, 28
 OFFSET = 20
 CELL_SIZE = 10
 
-handwriting = [[0] * COLS for _ in range(ROWS)]
+# Seconds to wait after the last stroke before classifying in continuous mode
+DEBOUNCE = 0.15
+
+handwriting = np.zeros((ROWS, COLS), dtype=np.float32)
 classification = None
 
+
+class Classifier():
+
+    def __init__(self, filename):
+        """
+        Load the model and classify drawings on a background thread,
+        so that prediction never blocks the event loop.
+        """
+        self.filename = filename
+        self.requests = queue.Queue(maxsize=1)
+        self.result = None
+        self.ready = False
+        self.version = 0
+        self.cleared = 0
+        threading.Thread(target=self.run, daemon=True).start()
+
+    def submit(self, drawing):
+        """
+        Queue a copy of `drawing` for classification, replacing any
+        drawing still waiting, since only the latest one matters.
+        """
+        self.version += 1
+        try:
+            self.requests.get_nowait()
+        except queue.Empty:
+            pass
+        self.requests.put((self.version, drawing.copy()))
+
+    def cancel(self):
+        """Discard any pending or running classification."""
+        self.cleared = self.version
+        self.result = None
+
+    def run(self):
+        """Load the model, then classify drawings as they arrive."""
+        model = tf.keras.models.load_model(self.filename)
+
+        # Calling the model directly avoids predict()'s per-call setup
+        model(np.zeros((1, ROWS, COLS, 1), dtype=np.float32), training=False)
+        self.ready = True
+        while True:
+            version, drawing = self.requests.get()
+            output = model(drawing.reshape(1, ROWS, COLS, 1), training=False)
+            if version > self.cleared:
+                self.result = int(np.argmax(output))
+
+
+classifier = Classifier(sys.argv[1])
+
+# The grid is drawn once, after which only cells that change are redrawn
+grid = pygame.Surface((COLS * CELL_SIZE, ROWS * CELL_SIZE))
+dirty = {(i, j) for i in range(ROWS) for j in range(COLS)}
+changed = None
+submitted = False
+
+
+def draw_cell(i, j):
+    """Redraw one grid cell on the grid surface."""
+    rect = pygame.Rect(j * CELL_SIZE, i * CELL_SIZE, CELL_SIZE, CELL_SIZE)
+
+    # If cell has been written on, darken cell
+    if handwriting[i, j]:
+        channel = int(255 - (handwriting[i, j] * 255))
+        pygame.draw.rect(grid, (channel, channel, channel), rect)
+
+    # Draw blank cell
+    else:
+        pygame.draw.rect(grid, WHITE, rect)
+    pygame.draw.rect(grid, BLACK, rect, 1)
+
+
+def write(i, j):
+    """Fill in cell (i, j) and its neighbors, marking them for redrawing."""
+    strokes = [(i, j, 250), (i + 1, j, 220), (i, j + 1, 220), (i + 1, j + 1, 190)]
+    for row, col, value in strokes:
+        value = np.float32(value / 255)
+        if row < ROWS and col < COLS and handwriting[row, col] != value:
+            handwriting[row, col] = value
+            dirty.add((row, col))
+
+
+# Buttons
+resetButton = pygame.Rect(
+    30, OFFSET + ROWS * CELL_SIZE + 30,
+    100, 30
+)
+resetText = smallFont.render("Reset", True, BLACK)
+resetTextRect = resetText.get_rect()
+resetTextRect.center = resetButton.center
+
+classifyButton = pygame.Rect(
+    150, OFFSET + ROWS * CELL_SIZE + 30,
+    100, 30
+)
+classifyText = smallFont.render("Classify", True, BLACK)
+classifyTextRect = classifyText.get_rect()
+classifyTextRect.center = classifyButton.center
+
 while True:
 
     # Check if game quit
@@ -47,75 +152,55 @@ while True:
     else:
         mouse = None
 
-    # Draw each grid cell
-    cells = []
-    for i in range(ROWS):
-        row = []
-        for j in range(COLS):
-            rect = pygame.Rect(
-                OFFSET + j * CELL_SIZE,
-                OFFSET + i * CELL_SIZE,
-                CELL_SIZE, CELL_SIZE
-            )
-
-            # If cell has been written on, darken cell
-            if handwriting[i][j]:
-                channel = 255 - (handwriting[i][j] * 255)
-                pygame.draw.rect(screen, (channel, channel, channel), rect)
-
-            # Draw blank cell
-            else:
-                pygame.draw.rect(screen, WHITE, rect)
-            pygame.draw.rect(screen, BLACK, rect, 1)
-
-            # If writing on this cell, fill in current cell and neighbors
-            if mouse and rect.collidepoint(mouse):
-                handwriting[i][j] = 250 / 255
-                if i + 1 < ROWS:
-                    handwriting[i + 1][j] = 220 / 255
-                if j + 1 < COLS:
-                    handwriting[i][j + 1] = 220 / 255
-                if i + 1 < ROWS and j + 1 < COLS:
-                    handwriting[i + 1][j + 1] = 190 / 255
-
-    # Reset button
-    resetButton = pygame.Rect(
-        30, OFFSET + ROWS * CELL_SIZE + 30,
-        100, 30
-    )
-    resetText = smallFont.render("Reset", True, BLACK)
-    resetTextRect = resetText.get_rect()
-    resetTextRect.center = resetButton.center
+    # If writing on a grid cell, fill in current cell and neighbors
+    if mouse:
+        i = (mouse[1] - OFFSET) // CELL_SIZE
+        j = (mouse[0] - OFFSET) // CELL_SIZE
+        if 0 <= i < ROWS and 0 <= j < COLS:
+            count = len(dirty)
+            write(i, j)
+            if len(dirty) > count:
+                changed = time.monotonic()
+                submitted = False
+
+    # Draw the grid with a single blit, after redrawing changed cells
+    for i, j in dirty:
+        draw_cell(i, j)
+    dirty.clear()
+    screen.blit(grid, (OFFSET, OFFSET))
+
+    # Draw buttons
     pygame.draw.rect(screen, WHITE, resetButton)
     screen.blit(resetText, resetTextRect)
-
-    # Classify button
-    classifyButton = pygame.Rect(
-        150, OFFSET + ROWS * CELL_SIZE + 30,
-        100, 30
-    )
-    classifyText = smallFont.render("Classify", True, BLACK)
-    classifyTextRect = classifyText.get_rect()
-    classifyTextRect.center = classifyButton.center
     pygame.draw.rect(screen, WHITE, classifyButton)
     screen.blit(classifyText, classifyTextRect)
 
     # Reset drawing
     if mouse and resetButton.collidepoint(mouse):
-        handwriting = [[0] * COLS for _ in range(ROWS)]
-        classification = None
-
-    # Generate classification
-    if mouse and classifyButton.collidepoint(mouse):
-        classification = model.predict(
-            [np.array(handwriting).reshape(1, 28, 28, 1)]
-        ).argmax()
+        dirty.update((int(i), int(j)) for i, j in np.argwhere(handwriting))
+        handwriting[:] = 0
+        classifier.cancel()
+        changed = None
+        submitted = False
+
+    # Request a classification, or one shortly after drawing stops
+    if mouse and classifyButton.collidepoint(mouse) and not submitted:
+        classifier.submit(handwriting)
+        submitted = True
+    elif continuous and changed is not None and time.monotonic() - changed > DEBOUNCE:
+        classifier.submit(handwriting)
+        submitted = True
+    if submitted:
+        changed = None
+    classification = classifier.result
 
     # Show classification if one exists
-    if classification is not None:
-        classificationText = largeFont.render(str(classification), True, WHITE)
+    grid_size = OFFSET * 2 + CELL_SIZE * COLS
+    if classification is not None or not classifier.ready:
+        text = str(classification) if classifier.ready else "Loading..."
+        font = largeFont if classifier.ready else smallFont
+        classificationText = font.render(text, True, WHITE)
         classificationRect = classificationText.get_rect()
-        grid_size = OFFSET * 2 + CELL_SIZE * COLS
         classificationRect.center = (
             grid_size + ((width - grid_size) / 2),
             100
@@ -123,3 +208,4 @@ while True:
         screen.blit(classificationText, classificationRect)
 
     pygame.display.flip()
+    clock.tick(FPS)
@@ -0,0 +1,116 @@
+import hashlib
+import os
+
+from concurrent.futures import ThreadPoolExecutor
+
+import cv2
+import numpy as np
+
+IMG_WIDTH = 30
+IMG_HEIGHT = 30
+CHUNK_SIZE = 256
+
+
+def list_images(data_dir):
+    """
+    Return the paths of all images in `data_dir` and their integer labels,
+    taken from the names of the category directories, in a fixed order.
+    """
+    paths = []
+    labels = []
+    categories = sorted(
+        (name for name in os.listdir(data_dir) if name.isdigit()), key=int
+    )
+    for category in categories:
+        directory = os.path.join(data_dir, category)
+        for name in sorted(os.listdir(directory)):
+            paths.append(os.path.join(directory, name))
+            labels.append(int(category))
+    return paths, np.array(labels, dtype=np.int64)
+
+
+def load_data(data_dir, workers=None, cache=True,
+              width=IMG_WIDTH, height=IMG_HEIGHT):
+    """
+    Load image data from directory `data_dir`, laid out as for
+    `traffic.load_data`.
+
+    Return tuple `(images, labels)`, where `images` is a uint8 array of
+    shape (N, width, height, 3) and `labels` is an int64 array of shape (N,).
+
+    Images are decoded and resized by a pool of threads straight into one
+    preallocated array. Unless `cache` is False, that array and the labels
+    are kept in `.npy` files in a `.cache` directory next to `data_dir`,
+    keyed by the paths, sizes and modification times of the images. Later
+    loads memory-map them instead of decoding again.
+    """
+    paths, labels = list_images(data_dir)
+    if not cache:
+        images = np.empty((len(paths), width, height, 3), dtype=np.uint8)
+        decode(paths, images, workers)
+        return images, labels
+
+    images_path, labels_path = cache_paths(data_dir, paths, width, height)
+    if not (os.path.exists(images_path) and os.path.exists(labels_path)):
+        clear_cache(data_dir)
+        os.makedirs(os.path.dirname(images_path), exist_ok=True)
+
+        # Decode into the cache file itself, then move it into place
+        partial = images_path + ".partial"
+        images = np.lib.format.open_memmap(
+            partial, mode="w+", dtype=np.uint8,
+            shape=(len(paths), width, height, 3)
+        )
+        decode(paths, images, workers)
+        images.flush()
+        del images
+        os.replace(partial, images_path)
+        np.save(labels_path, labels)
+
+    return (np.load(images_path, mmap_mode="r"),
+            np.load(labels_path, mmap_mode="r"))
+
+
+def decode(paths, images, workers=None):
+    """Read and resize every image in `paths` into the matching row of `images`."""
+    width, height = images.shape[1], images.shape[2]
+
+    def decode_chunk(start):
+        for k in range(start, min(start + CHUNK_SIZE, len(paths))):
+            image = cv2.imread(paths[k])
+            if image is None:
+                raise ValueError(f"could not read image {paths[k]}")
+            images[k] = cv2.resize(image, dsize=(height, width))
+
+    # OpenCV releases the GIL while decoding, so threads run in parallel
+    with ThreadPoolExecutor(max_workers=workers or os.cpu_count()) as executor:
+        for _ in executor.map(decode_chunk, range(0, len(paths), CHUNK_SIZE)):
+            pass
+
+
+def cache_paths(data_dir, paths, width, height):
+    """Return the image and label cache paths for the current contents of `data_dir`."""
+    key = hashlib.sha1(f"{width}x{height}".encode())
+    for path in paths:
+        stat = os.stat(path)
+        key.update(f"{os.path.relpath(path, data_dir)}:{stat.st_size}:{stat.st_mtime_ns}\n".encode())
+    directory, name = cache_location(data_dir)
+    stem = f"{name}-{key.hexdigest()[:16]}"
+    return (os.path.join(directory, f"{stem}.images.npy"),
+            os.path.join(directory, f"{stem}.labels.npy"))
+
+
+def cache_location(data_dir):
+    """Return the cache directory for `data_dir` and the prefix of its files."""
+    data_dir = os.path.abspath(data_dir)
+    return os.path.join(os.path.dirname(data_dir), ".cache"), os.path.basename(data_dir)
+
+
+def clear_cache(data_dir):
+    """Remove cached arrays left over from earlier contents of `data_dir`."""
+    directory, name = cache_location(data_dir)
+    if not os.path.isdir(directory):
+        return
+    for entry in os.listdir(directory):
+        if entry.startswith(f"{name}-") and (entry.endswith(".npy") or entry.endswith(".partial")):
+            os.remove(os.path.join(directory, entry))
@@ -0,0 +1,123 @@
+import sys
+
+import cv2
+import numpy as np
+import tensorflow as tf
+
+import loader
+
+from traffic import EPOCHS, IMG_WIDTH, IMG_HEIGHT, NUM_CATEGORIES, TEST_SIZE, get_model
+
+BATCH_SIZE = 32
+SHUFFLE_BUFFER = 4096
+AUTOTUNE = tf.data.AUTOTUNE
+
+
+def main():
+
+    # Check command-line arguments
+    args = sys.argv[1:]
+    packed = "--packed" in args
+    args = [arg for arg in args if arg != "--packed"]
+    if len(args) not in [1, 2]:
+        sys.exit("Usage: python pipeline.py [--packed] data_directory [model.h5]")
+
+    # Build streaming datasets over an index-based split
+    if packed:
+        images, labels = loader.load_data(args[0])
+        train_indices, test_indices = split(len(labels))
+        train = from_packed(images, labels, train_indices, shuffle=True)
+        test = from_packed(images, labels, test_indices)
+    else:
+        paths, labels = loader.list_images(args[0])
+        train_indices, test_indices = split(len(labels))
+        train = from_files(paths, labels, train_indices, shuffle=True)
+        test = from_files(paths, labels, test_indices)
+
+    # Fit and evaluate a model without holding the dataset in memory
+    model = get_model()
+    model.fit(train, epochs=EPOCHS)
+    model.evaluate(test, verbose=2)
+
+    # Save model to file
+    if len(args) == 2:
+        filename = args[1]
+        model.save(filename)
+        print(f"Model saved to {filename}.")
+
+
+def split(count, test_size=TEST_SIZE, seed=0):
+    """Return shuffled train and test index arrays for `count` examples."""
+    order = np.random.default_rng(seed).permutation(count)
+    boundary = int(round(count * (1 - test_size)))
+    return order[:boundary], order[boundary:]
+
+
+def from_files(paths, labels, indices, shuffle=False, batch_size=BATCH_SIZE,
+               buffer_size=SHUFFLE_BUFFER, scale=1 / 255):
+    """
+    Return a dataset of (images, one-hot labels) batches that reads the
+    images at `indices` from disk as it goes.
+
+    Paths are shuffled with a bounded buffer, then decoded and resized in
+    parallel, scaled by `scale`, batched and prefetched. Only the paths
+    and labels are ever held in memory.
+    """
+    paths = np.asarray(paths)[indices]
+    labels = np.asarray(labels)[indices]
+    dataset = tf.data.Dataset.from_tensor_slices((paths, labels))
+    if shuffle:
+        dataset = dataset.shuffle(min(buffer_size, len(paths)), reshuffle_each_iteration=True)
+
+    def read(path, label):
+        image = tf.numpy_function(decode, [path], tf.uint8)
+        image.set_shape((IMG_WIDTH, IMG_HEIGHT, 3))
+        return normalize(image, label, scale)
+
+    return (dataset
+            .map(read, num_parallel_calls=AUTOTUNE, deterministic=not shuffle)
+            .batch(batch_size)
+            .prefetch(AUTOTUNE))
+
+
+def from_packed(images, labels, indices, shuffle=False, batch_size=BATCH_SIZE,
+                buffer_size=SHUFFLE_BUFFER, scale=1 / 255):
+    """
+    Return a dataset of (images, one-hot labels) batches gathered from a
+    packed image array, such as the memory-mapped one from
+    `loader.load_data`. Only the rows of each batch are read.
+    """
+    dataset = tf.data.Dataset.from_tensor_slices(np.asarray(indices))
+    if shuffle:
+        dataset = dataset.shuffle(min(buffer_size, len(indices)), reshuffle_each_iteration=True)
+
+    def gather(batch):
+        return images[batch], np.asarray(labels[batch])
+
+    def read(batch):
+        image, label = tf.numpy_function(gather, [batch], [tf.uint8, tf.int64])
+        image.set_shape((None, IMG_WIDTH, IMG_HEIGHT, 3))
+        label.set_shape((None,))
+        return normalize(image, label, scale)
+
+    return (dataset
+            .batch(batch_size)
+            .map(read, num_parallel_calls=AUTOTUNE)
+            .prefetch(AUTOTUNE))
+
+
+def decode(path):
+    """Read and resize a single image file."""
+    image = cv2.imread(path.decode())
+    if image is None:
+        raise ValueError(f"could not read image {path.decode()}")
+    return cv2.resize(image, dsize=(IMG_HEIGHT, IMG_WIDTH))
+
+
+def normalize(image, label, scale):
+    """Scale pixel values to floats and one-hot encode the label."""
+    return tf.cast(image, tf.float32) * scale, tf.one_hot(label, NUM_CATEGORIES)
+
+
+if __name__ == "__main__":
+    main()
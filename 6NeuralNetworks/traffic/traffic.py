@@ -1,11 +1,10 @@
-import cv2
-import numpy as np
-import os
 import sys
 import tensorflow as tf
 
 from sklearn.model_selection import train_test_split
 
+import loader
+
 EPOCHS = 10
 IMG_WIDTH = 30
 IMG_HEIGHT = 30
@@ -19,13 +18,13 @@ def main():
     if len(sys.argv) not in [2, 3]:
         sys.exit("Usage: python traffic.py data_directory [model.h5]")
 
-    # Get image arrays and labels for all image files
+    # Get image arrays and labels for all image files (decoded in parallel, then cached)
     images, labels = load_data(sys.argv[1])
 
     # Split data into training and testing sets
-    labels = tf.keras.utils.to_categorical(labels)
+    labels = tf.keras.utils.to_categorical(labels, NUM_CATEGORIES)
     x_train, x_test, y_train, y_test = train_test_split(
-        np.array(images), np.array(labels), test_size=TEST_SIZE
+        images, labels, test_size=TEST_SIZE
     )
 
     # Get a compiled neural network
@@ -58,19 +57,7 @@ def load_data(data_dir):
     be a list of integer labels, representing the categories for each of the
     corresponding `images`.
     """
-    images = []  # list of images represented as numpy.ndarray
-    labels = []  # list of the category number of the corresponding image (folder name i.e an int)
-
-    for sub_dir in os.listdir(data_dir):
-        curr_dir = os.path.join(data_dir, sub_dir)
-        for img in os.listdir(curr_dir):
-            with open(os.path.join(curr_dir, img)) as image:
-                new_img = cv2.imread(image.name)
-                new_img = cv2.resize(new_img, dsize=(IMG_WIDTH, IMG_HEIGHT))
-                images.append(new_img)
-                labels.append(int(sub_dir))
-    
-    return (images, labels)
+    return loader.load_data(data_dir, width=IMG_WIDTH, height=IMG_HEIGHT)
 
 
 def get_model():
@@ -0,0 +1,231 @@
+import hashlib
+import os
+import pickle
+
+from array import array
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+
+from index import InvertedIndex
+
+# Bump whenever the cache layout changes, so old caches are not reused
+CACHE_VERSION = 3
+
+# Text run through the tokenizer when fingerprinting it, so that changes in
+# what it keeps (e.g. the stopword list) invalidate the cache
+PROBE = (
+    "The quick brown fox didn't jump over the lazy dog; it was not there. "
+    "What did you say about them, and why? Mr. Smith paid $3.50 for it!\n"
+    "A second passage: once upon a time, I, me, my, myself, we, our, ours."
+)
+
+
+class Corpus():
+
+    def __init__(self, terms, files, index=None):
+        """
+        A tokenized corpus. `terms` lists every word, so that a word's
+        position is its term id, and `files` maps each filename to an entry
+        holding its `stamp`, `words` (an array of term ids), `counts` (an
+        array of the distinct term ids and an array of their frequencies)
+        and `sentences` (a list of (sentence, array of term ids) pairs).
+        `index` is an `InvertedIndex` of the files, or None until
+        `build_index` is called.
+        """
+        self.terms = terms
+        self.files = files
+        self.ids = {term: i for i, term in enumerate(terms)}
+        self.index = index
+
+    @property
+    def idfs(self):
+        """Map each word to its IDF value across files."""
+        return self.index.idfs
+
+    @property
+    def documents(self):
+        """Map each filename to its list of words."""
+        return {
+            filename: self.decode(entry["words"])
+            for filename, entry in self.files.items()
+        }
+
+    def sentences(self, filename):
+        """Return (sentence, list of words) pairs for the sentences in `filename`."""
+        return [
+            (sentence, self.decode(words))
+            for sentence, words in self.files[filename]["sentences"]
+        ]
+
+    def decode(self, ids):
+        """Return the words with term ids `ids`."""
+        terms = self.terms
+        return [terms[i] for i in ids]
+
+    def build_index(self):
+        """Return an `InvertedIndex` of the files, built from their term counts."""
+        terms = self.terms
+        return InvertedIndex({
+            filename: {terms[i]: tf for i, tf in zip(*entry["counts"])}
+            for filename, entry in self.files.items()
+        }, counted=True)
+
+    def prune(self):
+        """Drop terms that no file uses any more, renumbering the rest."""
+        used = set()
+        for entry in self.files.values():
+            used.update(entry["counts"][0])
+            for _, ids in entry["sentences"]:
+                used.update(ids)
+        if len(used) == len(self.terms):
+            return
+
+        kept = sorted(used)
+        remap = array("I", [0]) * len(self.terms)
+        for new, old in enumerate(kept):
+            remap[old] = new
+        for entry in self.files.values():
+            entry["words"] = array("I", (remap[i] for i in entry["words"]))
+            entry["counts"] = (array("I", (remap[i] for i in entry["counts"][0])),
+                               entry["counts"][1])
+            entry["sentences"] = [
+                (sentence, array("I", (remap[i] for i in ids)))
+                for sentence, ids in entry["sentences"]
+            ]
+        self.terms = [self.terms[i] for i in kept]
+        self.ids = {term: i for i, term in enumerate(self.terms)}
+
+    def encode(self, words):
+        """Return an array of term ids for `words`, adding any new terms."""
+        ids = array("I")
+        for word in words:
+            i = self.ids.get(word)
+            if i is None:
+                i = self.ids[word] = len(self.terms)
+                self.terms.append(word)
+            ids.append(i)
+        return ids
+
+
+def load_corpus(directory, tokenize, split_sentences, cache=True, workers=None):
+    """
+    Return a `Corpus` of the files in `directory`, where
+    `tokenize(text)` turns text into a list of words and
+    `split_sentences(text)` splits it into sentences.
+
+    Unless `cache` is False, the corpus and its index are saved to a
+    `.cache` directory next to `directory`. Later loads only tokenize
+    files whose size or modification time changed, across `workers`
+    processes, and reuse the saved index if nothing changed. The cache
+    is discarded if CACHE_VERSION or the fingerprint of `tokenize` and
+    `split_sentences` changed.
+    """
+    path = cache_path(directory)
+    key = (CACHE_VERSION, fingerprint(tokenize, split_sentences))
+    terms, files, index = [], {}, None
+    if cache and os.path.exists(path):
+        with open(path, "rb") as f:
+            saved = pickle.load(f)
+        if saved.get("key") == key:
+            terms, files, index = saved["terms"], saved["files"], saved["index"]
+
+    # Find files that are new or changed since the cache was written
+    stamps = {}
+    for filename in os.listdir(directory):
+        stat = os.stat(os.path.join(directory, filename))
+        stamps[filename] = (stat.st_size, stat.st_mtime_ns)
+    stale = sorted(
+        filename for filename, stamp in stamps.items()
+        if filename not in files or files[filename]["stamp"] != stamp
+    )
+    removed = [filename for filename in files if filename not in stamps]
+    if not stale and not removed:
+        return Corpus(terms, files, index)
+
+    # Forget removed and changed files, and any terms only they used
+    corpus = Corpus(terms, {
+        filename: entry for filename, entry in files.items()
+        if filename in stamps and filename not in stale
+    })
+    if len(corpus.files) < len(files):
+        corpus.prune()
+
+    # Tokenize the stale files in parallel, then encode them as term ids
+    paths = [os.path.join(directory, filename) for filename in stale]
+    with ProcessPoolExecutor(workers) as executor:
+        results = executor.map(
+            tokenize_file, paths, [tokenize] * len(paths), [split_sentences] * len(paths)
+        )
+        for filename, (words, sentences) in zip(stale, results):
+            words = corpus.encode(words)
+            counts = Counter(words)
+            corpus.files[filename] = {
+                "stamp": stamps[filename],
+                "words": words,
+                "counts": (array("I", counts), array("I", counts.values())),
+                "sentences": [
+                    (sentence, corpus.encode(tokens)) for sentence, tokens in sentences
+                ]
+            }
+    corpus.files = dict(sorted(corpus.files.items()))
+    corpus.index = corpus.build_index()
+
+    if cache:
+        save(corpus, path, key)
+    return corpus
+
+
+def tokenize_file(path, tokenize, split_sentences):
+    """
+    Return the words of the file at `path`, and a list of (sentence,
+    words) pairs for its sentences that have any words.
+    """
+    with open(path) as f:
+        text = f.read()
+    sentences = []
+    for sentence in split_sentences(text):
+        tokens = tokenize(sentence)
+        if tokens:
+            sentences.append((sentence, tokens))
+    return tokenize(text), sentences
+
+
+def cache_path(directory):
+    """Return the cache file for the corpus in `directory`."""
+    parent, name = os.path.split(os.path.abspath(directory))
+    return os.path.join(parent, ".cache", f"{name}.corpus.pickle")
+
+
+def fingerprint(*functions):
+    """
+    Return a digest of the code of `functions` and of their output on
+    PROBE. Changes to code they call, or to data they read, are only
+    noticed if they change that output; bump CACHE_VERSION otherwise.
+    """
+    digest = hashlib.sha256()
+    for function in functions:
+        digest.update(code_digest(function.__code__))
+        digest.update(repr(function(PROBE)).encode())
+    return digest.hexdigest()
+
+
+def code_digest(code):
+    """Return the bytecode, names and constants of `code`, including nested functions."""
+    parts = [code.co_code, repr(code.co_names).encode()]
+    for const in code.co_consts:
+        parts.append(code_digest(const) if hasattr(const, "co_code") else repr(const).encode())
+    return b"\0".join(parts)
+
+
+def save(corpus, path, key):
+    """Write `corpus` to `path`, replacing any earlier cache atomically."""
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    temporary = f"{path}.{os.getpid()}.tmp"
+    with open(temporary, "wb") as f:
+        pickle.dump({
+            "key": key,
+            "terms": corpus.terms,
+            "files": corpus.files,
+            "index": corpus.index
+        }, f, protocol=pickle.HIGHEST_PROTOCOL)
+    os.replace(temporary, path)
@@ -0,0 +1,71 @@
+import heapq
+import itertools
+import math
+
+from collections import Counter
+
+
+class InvertedIndex():
+
+    def __init__(self, documents, counted=False):
+        """
+        Build an index over `documents`, a dictionary mapping names of
+        documents to a list of their words, or, if `counted` is true, to
+        a dictionary mapping each of their words to its term frequency.
+
+        `postings` maps each word to a list of (document id, term
+        frequency) pairs, one for every document containing the word,
+        in document id order. `names` maps ids back to document names.
+        """
+        self.names = list(documents)
+        self.postings = {}
+        for doc, name in enumerate(self.names):
+            counts = documents[name] if counted else Counter(documents[name])
+            for word, tf in counts.items():
+                self.postings.setdefault(word, []).append((doc, tf))
+
+        # idf[word] = ln(number of documents / number of documents containing the word)
+        self.idfs = {
+            word: math.log(len(self.names) / len(postings))
+            for word, postings in self.postings.items()
+        }
+
+        # Length of each document's tf-idf vector, for cosine similarity
+        squares = [0.0] * len(self.names)
+        for word, postings in self.postings.items():
+            idf = self.idfs[word]
+            for doc, tf in postings:
+                squares[doc] += (tf * idf) ** 2
+        self.norms = [math.sqrt(square) for square in squares]
+
+    def search(self, query, n, idfs=None, normalize=False):
+        """
+        Return the names of the `n` documents that best match `query` (a set
+        of words), ranked by the sum of tf-idf over the query words, using
+        the index's own IDF values unless `idfs` is given.
+
+        Only the postings of the query words are visited. If `normalize`
+        is true, scores are divided by the document norms (cosine
+        similarity). Ties go to the document that was added first.
+        """
+        idfs = self.idfs if idfs is None else idfs
+        scores = {}
+        for word in query:
+            if word not in self.postings:
+                continue
+            idf = idfs[word]
+            for doc, tf in self.postings[word]:
+                scores[doc] = scores.get(doc, 0) + tf * idf
+
+        if normalize:
+            for doc in scores:
+                if self.norms[doc]:
+                    scores[doc] /= self.norms[doc]
+
+        best = heapq.nlargest(n, scores, key=lambda doc: (scores[doc], -doc))
+
+        # Documents without any query word rank last, in order
+        if len(best) < n:
+            unmatched = (doc for doc in range(len(self.names)) if doc not in scores)
+            best.extend(itertools.islice(unmatched, n - len(best)))
+        return [self.names[doc] for doc in best]
@@ -1,16 +1,19 @@
 from collections import defaultdict
-from matplotlib.pyplot import get
 import nltk
 import sys
 import os
 import string
 import math
+import functools
 
-from prometheus_client import Counter
+from corpus import load_corpus
+from index import InvertedIndex
 
 FILE_MATCHES = 1
 SENTENCE_MATCHES = 1
 
+PUNCTUATION = frozenset(string.punctuation)
+
 
 def main():
 
@@ -18,28 +21,21 @@ def main():
     if len(sys.argv) != 2:
         sys.exit("Usage: python questions.py corpus")
 
-    # Calculate IDF values across files
-    files = load_files(sys.argv[1])
-    file_words = {
-        filename: tokenize(files[filename])
-        for filename in files
-    }
-    file_idfs = compute_idfs(file_words)
+    # Tokenize and index files (or load both from the cache)
+    corpus = load_corpus(sys.argv[1], tokenize, split_sentences)
+    file_idfs = corpus.idfs
 
     # Prompt user for query
     query = set(tokenize(input("Query: ")))
 
     # Determine top file matches according to TF-IDF
-    filenames = top_files(query, file_words, file_idfs, n=FILE_MATCHES)
+    filenames = top_files(query, None, file_idfs, n=FILE_MATCHES, index=corpus.index)
 
     # Extract sentences from top files
     sentences = dict()
     for filename in filenames:
-        for passage in files[filename].split("\n"):
-            for sentence in nltk.sent_tokenize(passage):
-                tokens = tokenize(sentence)
-                if tokens:
-                    sentences[sentence] = tokens
+        for sentence, tokens in corpus.sentences(filename):
+            sentences[sentence] = tokens
 
     # Compute IDF values across sentences
     idfs = compute_idfs(sentences)
@@ -70,14 +66,28 @@ def tokenize(document):
     Process document by coverting all words to lowercase, and removing any
     punctuation or English stopwords.
     """
-    stopwords = nltk.corpus.stopwords.words("english")
-    punctuation = set(string.punctuation)
-    
+    stopwords = english_stopwords()
+
     return ([word
              for word in nltk.word_tokenize(document.lower())
-             if word not in stopwords and not set(word).issubset(punctuation)
+             if word not in stopwords and not PUNCTUATION.issuperset(word)
              ])
 
+
+@functools.cache
+def english_stopwords():
+    """Return the set of English stopwords, loaded once."""
+    return frozenset(nltk.corpus.stopwords.words("english"))
+
+
+def split_sentences(document):
+    """Split a document into sentences, one passage (line) at a time."""
+    return [
+        sentence
+        for passage in document.split("\n")
+        for sentence in nltk.sent_tokenize(passage)
+    ]
+
 def compute_idfs(documents):
     """
     Given a dictionary of `documents` that maps names of documents to a list
@@ -86,7 +96,6 @@ def compute_idfs(documents):
     Any word that appears in at least one of the documents should be in the
     resulting dictionary.
     """
-    words = set(sum(documents.values(), []))
     counts = defaultdict(int)
 
     for doc in documents:
@@ -94,28 +103,25 @@ def compute_idfs(documents):
             counts[word] += 1
     
     # formula: idf[word] = ln(no_of_doucments / no_of_doucuments_in_which_the_word_appeared)
-    idfs = {word: math.log(len(documents) / counts[word]) for word in words}
+    idfs = {word: math.log(len(documents) / counts[word]) for word in counts}
 
     return idfs
 
     
-def top_files(query, files, idfs, n):
+def top_files(query, files, idfs, n, index=None):
     """
     Given a `query` (a set of words), `files` (a dictionary mapping names of
     files to a list of their words), and `idfs` (a dictionary mapping words
     to their IDF values), return a list of the filenames of the the `n` top
     files that match the query, ranked according to tf-idf.
-    """
-    tfidfs = dict()
 
-    for filename in files:
-        tfidfs[filename] = 0
-        for word in query.intersection(set(files[filename])):
-            tf = files[filename].count(word)
-            tfidfs[filename] += tf * idfs[word]
-    
-    rank = sorted(tfidfs, key=tfidfs.get, reverse=True)
-    return rank[:n]
+    Pass an `InvertedIndex` of `files` as `index` to reuse it across
+    queries, in which case `files` is not read and may be None;
+    otherwise one is built for this query.
+    """
+    if index is None:
+        index = InvertedIndex(files)
+    return index.search(query, n, idfs=idfs)
 
 
 def top_sentences(query, sentences, idfs, n):